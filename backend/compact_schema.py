@@ -0,0 +1,236 @@
+import os
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+# Compact in-memory schema snapshots for the metadata caches.
+# Each table stores its columns column-wise: names in one NUL-joined string, types as
+# indices into a process-wide pool of interned type strings, and nullable/primary-key
+# flags in a byte array. Descriptions and column profiles are kept sparsely by position.
+# Tables convert back to the dicts returned by load_connection_metadata on demand.
+COMPACT_CACHE_MAX_CONNECTIONS = int(os.getenv("DATASCOUT_COMPACT_CACHE_MAX_CONNECTIONS", "64"))
+
+NULLABLE = 1
+PRIMARY_KEY = 2
+_SEPARATOR = "\x00"
+
+_type_pool: List[str] = []
+_type_ids: Dict[str, int] = {}
+_type_lock = threading.Lock()
+
+
+def _type_id(type_name: str) -> int:
+    type_id = _type_ids.get(type_name)
+    if type_id is None:
+        with _type_lock:
+            type_id = _type_ids.get(type_name)
+            if type_id is None:
+                type_id = len(_type_pool)
+                _type_pool.append(sys.intern(type_name))
+                _type_ids[_type_pool[type_id]] = type_id
+    return type_id
+
+
+class CompactTable:
+    __slots__ = ("name", "context", "_names", "types", "flags", "descriptions", "profiles", "foreign_keys",
+                 "row_estimate", "size_bytes")
+
+    def __init__(self, table: Dict[str, Any]):
+        columns = table["columns"]
+        self.name = sys.intern(table["name"])
+        self.context = table.get("table_context")
+        self._names = _SEPARATOR.join(column["name"] for column in columns)
+        type_ids = [_type_id(column["type"] or "") for column in columns]
+        self.types = array("H" if max(type_ids, default=0) < 65536 else "I", type_ids)
+        self.flags = bytes(
+            (NULLABLE if column.get("nullable", True) else 0) | (PRIMARY_KEY if column.get("primary_key") else 0)
+            for column in columns
+        )
+        self.descriptions = {i: column["description"] for i, column in enumerate(columns) if column.get("description")} or None
+        self.profiles = {i: column["profile"] for i, column in enumerate(columns) if column.get("profile")} or None
+        self.foreign_keys = tuple(
+            (fk["constraint_name"], sys.intern(fk["column_name"]), sys.intern(fk["referred_table"]), sys.intern(fk["referred_column"]))
+            for fk in table.get("foreign_keys", ())
+        ) or None
+        self.row_estimate = table.get("row_estimate")
+        self.size_bytes = table.get("size_bytes")
+
+    @property
+    def column_names(self) -> List[str]:
+        return self._names.split(_SEPARATOR) if self.flags else []
+
+    def __len__(self) -> int:
+        return len(self.flags)
+
+    def columns(self) -> List[Dict[str, Any]]:
+        descriptions = self.descriptions or {}
+        profiles = self.profiles or {}
+        columns = []
+        for i, name in enumerate(self.column_names):
+            column = {
+                "name": name,
+                "type": _type_pool[self.types[i]],
+                "nullable": bool(self.flags[i] & NULLABLE),
+                "primary_key": bool(self.flags[i] & PRIMARY_KEY)
+            }
+            if i in descriptions:
+                column["description"] = descriptions[i]
+            if i in profiles:
+                column["profile"] = profiles[i]
+            columns.append(column)
+        return columns
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "table_context": self.context,
+            "columns": self.columns(),
+            "foreign_keys": [
+                {"table_name": self.name, "constraint_name": constraint_name, "column_name": column_name,
+                 "referred_table": referred_table, "referred_column": referred_column}
+                for constraint_name, column_name, referred_table, referred_column in self.foreign_keys or ()
+            ],
+            "row_estimate": self.row_estimate,
+            "size_bytes": self.size_bytes
+        }
+
+    def set_description(self, column_name: str, description: str) -> bool:
+        try:
+            position = self.column_names.index(column_name)
+        except ValueError:
+            return False
+        descriptions = self.descriptions or {}
+        if description:
+            descriptions[position] = description
+        else:
+            descriptions.pop(position, None)
+        self.descriptions = descriptions or None
+        return True
+
+
+class CompactSchema:
+    __slots__ = ("connection_id", "db_type", "database", "global_context", "tables")
+
+    def __init__(self, metadata: Dict[str, Any]):
+        self.connection_id = metadata["connection_id"]
+        self.db_type = metadata.get("db_type")
+        self.database = metadata.get("database")
+        self.global_context = metadata.get("global_context")
+        self.tables: Dict[str, CompactTable] = {table["name"]: CompactTable(table) for table in metadata["tables"]}
+
+    def to_metadata(self, table_names: List[str] = None) -> Dict[str, Any]:
+        """Rebuild the load_connection_metadata shape, optionally for ``table_names`` only."""
+        if table_names is None:
+            tables = self.tables.values()
+        else:
+            tables = [self.tables[name] for name in table_names if name in self.tables]
+        return {
+            "connection_id": self.connection_id,
+            "db_type": self.db_type,
+            "database": self.database,
+            "global_context": self.global_context,
+            "tables": [table.to_dict() for table in tables]
+        }
+
+
+_schemas: "OrderedDict[int, CompactSchema]" = OrderedDict()
+# Bumped by every edit and invalidation, so a load that raced one is not cached.
+_generations: Dict[int, int] = {}
+_epoch = 0
+_lock = threading.Lock()
+
+
+def _generation(connection_id: int) -> tuple:
+    return _epoch, _generations.get(connection_id, 0)
+
+
+def _bump(connection_id: int):
+    _generations[connection_id] = _generations.get(connection_id, 0) + 1
+
+
+def get_schema(connection_id: int, load: Callable[[int], Optional[Dict[str, Any]]]) -> Optional[CompactSchema]:
+    with _lock:
+        schema = _schemas.get(connection_id)
+        if schema is not None:
+            _schemas.move_to_end(connection_id)
+            return schema
+        generation = _generation(connection_id)
+    # Loaded outside the lock; an edit or invalidation meanwhile means this copy may be stale.
+    metadata = load(connection_id)
+    if metadata is None:
+        return None
+    schema = CompactSchema(metadata)
+    with _lock:
+        if _generation(connection_id) != generation:
+            return schema
+        _schemas[connection_id] = schema
+        while len(_schemas) > COMPACT_CACHE_MAX_CONNECTIONS:
+            _schemas.popitem(last=False)
+    return schema
+
+
+def get_metadata(connection_id: int, load: Callable[[int], Optional[Dict[str, Any]]],
+                 table_names: List[str] = None) -> Optional[Dict[str, Any]]:
+    """Drop-in replacement for load_connection_metadata that serves from the compact cache."""
+    schema = get_schema(connection_id, load)
+    if schema is None:
+        return None
+    with _lock:
+        return schema.to_metadata(table_names)
+
+
+def get_table(connection_id: int, table_name: str, load: Callable[..., Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    """Return one table from the cache; on a miss, load only that table and leave the cache cold.
+
+    ``load`` is called as ``load(connection_id, [table_name])`` so a single-table fetch never reads
+    the rest of the connection's metadata.
+    """
+    with _lock:
+        schema = _schemas.get(connection_id)
+        if schema is not None:
+            _schemas.move_to_end(connection_id)
+            table = schema.tables.get(table_name)
+            return table.to_dict() if table is not None else None
+    metadata = load(connection_id, [table_name])
+    if metadata is None or not metadata["tables"]:
+        return None
+    return CompactTable(metadata["tables"][0]).to_dict()
+
+
+def on_table_context_updated(connection_id: int, table_name: str, context: str):
+    with _lock:
+        _bump(connection_id)
+        schema = _schemas.get(connection_id)
+        if schema is not None and table_name in schema.tables:
+            schema.tables[table_name].context = context
+
+
+def on_column_description_updated(connection_id: int, table_name: str, column_name: str, description: str):
+    with _lock:
+        _bump(connection_id)
+        schema = _schemas.get(connection_id)
+        if schema is not None and table_name in schema.tables:
+            schema.tables[table_name].set_description(column_name, description)
+
+
+def on_global_context_updated(connection_id: int, context: str):
+    with _lock:
+        _bump(connection_id)
+        schema = _schemas.get(connection_id)
+        if schema is not None:
+            schema.global_context = context
+
+
+def invalidate(connection_id: int):
+    with _lock:
+        _bump(connection_id)
+        _schemas.pop(connection_id, None)
+
+
+def clear():
+    global _epoch
+    with _lock:
+        _epoch += 1
+        _schemas.clear()
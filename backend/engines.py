@@ -0,0 +1,129 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from backend import metrics
+
+# Engine registry shared by every endpoint.
+# Engines are keyed by their normalized URL so that repeated calls against the
+# same database reuse one connection pool instead of building a new one.
+POOL_SIZE = int(os.getenv("DATASCOUT_POOL_SIZE", "5"))
+POOL_MAX_OVERFLOW = int(os.getenv("DATASCOUT_POOL_MAX_OVERFLOW", "10"))
+POOL_RECYCLE_SECONDS = int(os.getenv("DATASCOUT_POOL_RECYCLE", "1800"))
+POOL_TIMEOUT_SECONDS = int(os.getenv("DATASCOUT_POOL_TIMEOUT", "30"))
+MAX_ENGINES = int(os.getenv("DATASCOUT_MAX_ENGINES", "32"))
+ENGINE_IDLE_SECONDS = int(os.getenv("DATASCOUT_ENGINE_IDLE_SECONDS", "900"))
+
+_engines: "OrderedDict[str, Engine]" = OrderedDict()
+_last_used: dict = {}
+_lock = threading.Lock()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited, including opening a new connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started, dialect=self._dialect.name)
+
+
+def normalize_url(url: str) -> str:
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database and parsed.database != ":memory:":
+        parsed = parsed.set(database=os.path.abspath(parsed.database))
+    return parsed.render_as_string(hide_password=False)
+
+
+def _apply_pragmas(engine: Engine, pragmas):
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def build_engine(url: str, sqlite_pragmas=None, shared_memory: bool = False, connect_args: dict = None) -> Engine:
+    """Create an engine outside the registry.
+
+    ``sqlite_pragmas`` are (name, value) pairs run on every new SQLite connection.
+    With ``shared_memory`` an in-memory SQLite database is one connection shared by all threads.
+    ``connect_args`` are passed to the driver for server databases.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        # In-memory databases keep SQLite's own pool; files use a queue pool either way.
+        if not parsed.database or parsed.database == ":memory:":
+            poolclass = StaticPool if shared_memory else None
+            engine = create_engine(url, connect_args={"check_same_thread": False}, poolclass=poolclass)
+        else:
+            engine = create_engine(url, connect_args={"check_same_thread": False}, poolclass=TimedQueuePool)
+        if sqlite_pragmas:
+            _apply_pragmas(engine, sqlite_pragmas)
+        return engine
+    return create_engine(
+        url,
+        connect_args=connect_args or {},
+        poolclass=TimedQueuePool,
+        pool_size=POOL_SIZE,
+        max_overflow=POOL_MAX_OVERFLOW,
+        pool_recycle=POOL_RECYCLE_SECONDS,
+        pool_timeout=POOL_TIMEOUT_SECONDS,
+        pool_pre_ping=True,
+    )
+
+
+def _evict_idle(now: float):
+    # Caller must hold _lock.
+    for key in list(_engines.keys()):
+        if now - _last_used.get(key, now) > ENGINE_IDLE_SECONDS:
+            _dispose(key)
+
+
+def _dispose(key: str):
+    # Caller must hold _lock.
+    engine = _engines.pop(key, None)
+    _last_used.pop(key, None)
+    if engine is not None:
+        engine.dispose()
+
+
+def get_engine(url: str) -> Engine:
+    key = normalize_url(url)
+    now = time.monotonic()
+    with _lock:
+        engine = _engines.get(key)
+        if engine is not None:
+            _engines.move_to_end(key)
+            _last_used[key] = now
+            return engine
+
+        _evict_idle(now)
+        engine = build_engine(key)
+        _engines[key] = engine
+        _last_used[key] = now
+        while len(_engines) > MAX_ENGINES:
+            oldest = next(iter(_engines))
+            _dispose(oldest)
+        return engine
+
+
+def dispose_engine(url: str):
+    with _lock:
+        _dispose(normalize_url(url))
+
+
+def dispose_all():
+    with _lock:
+        for key in list(_engines.keys()):
+            _dispose(key)
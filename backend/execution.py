@@ -0,0 +1,120 @@
+import json
+import os
+from typing import Iterator, Tuple
+
+from sqlalchemy.engine import Engine
+
+from backend import result_cache
+from backend.metrics import span
+from backend.responses import FAST_RESPONSES, dumps
+from backend.sql_guard import assert_read_only
+
+# Streaming query execution.
+# Rows are pulled from a server-side cursor in fixed-size partitions and written
+# out as NDJSON, so memory stays flat regardless of result size.
+QUERY_FETCH_SIZE = int(os.getenv("DATASCOUT_QUERY_FETCH_SIZE", "500"))
+QUERY_MAX_ROWS = int(os.getenv("DATASCOUT_QUERY_MAX_ROWS", "10000"))
+QUERY_MAX_BYTES = int(os.getenv("DATASCOUT_QUERY_MAX_BYTES", str(50 * 1024 * 1024)))
+
+# Statements that make the query's transaction read-only, behind the SQL guard.
+# SQL Server has no read-only transaction mode, so it relies on the guard alone.
+READ_ONLY_BEGIN = {
+    "postgresql": "SET TRANSACTION READ ONLY",
+    "mysql": "SET TRANSACTION READ ONLY",
+    "mariadb": "SET TRANSACTION READ ONLY",
+    "sqlite": "PRAGMA query_only = ON",
+}
+# query_only is a connection setting, so it is switched back off before the connection returns to the pool.
+READ_ONLY_END = {
+    "sqlite": "PRAGMA query_only = OFF",
+}
+
+
+def _encode(payload) -> bytes:
+    if FAST_RESPONSES:
+        return dumps(payload) + b"\n"
+    return (json.dumps(payload, default=str, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def open_query_stream(engine: Engine, sql: str, max_rows: int = None, max_bytes: int = None) -> Iterator[bytes]:
+    """Execute ``sql`` and return an iterator of NDJSON lines.
+
+    The statement runs before this returns, so connection and syntax errors
+    surface to the caller instead of midway through the response. The first
+    line carries the column names, each following line is one row as a JSON
+    array, and the last line reports the row count and whether a cap was hit.
+    """
+    assert_read_only(sql, engine.dialect.name)
+    max_rows = min(max_rows or QUERY_MAX_ROWS, QUERY_MAX_ROWS)
+    max_bytes = min(max_bytes or QUERY_MAX_BYTES, QUERY_MAX_BYTES)
+
+    with span("connect"):
+        connection = engine.connect()
+    try:
+        with span("execute"):
+            begin = READ_ONLY_BEGIN.get(engine.dialect.name)
+            if begin:
+                connection.exec_driver_sql(begin)
+            result = connection.execution_options(yield_per=QUERY_FETCH_SIZE).exec_driver_sql(sql)
+    except Exception:
+        _close(connection)
+        raise
+    return _stream_rows(connection, result, max_rows, max_bytes)
+
+
+def _close(connection):
+    # Roll back first so the read-only transaction ends and connection settings can be reset.
+    try:
+        connection.rollback()
+        end = READ_ONLY_END.get(connection.dialect.name)
+        if end:
+            connection.exec_driver_sql(end)
+            connection.commit()
+    finally:
+        connection.close()
+
+
+def open_cached_query_stream(connection_id: int, engine: Engine, sql: str, fingerprint: str,
+                             max_rows: int = None, max_bytes: int = None) -> Tuple[Iterator[bytes], bool]:
+    """Serve ``sql`` from the result cache, or stream it from the source and cache it.
+
+    Returns the NDJSON line iterator and whether it was a cache hit.
+    """
+    verdict = assert_read_only(sql, engine.dialect.name)
+    max_rows = min(max_rows or QUERY_MAX_ROWS, QUERY_MAX_ROWS)
+    max_bytes = min(max_bytes or QUERY_MAX_BYTES, QUERY_MAX_BYTES)
+    key = result_cache.make_key(connection_id, verdict.normalized, fingerprint, max_rows, max_bytes)
+    lines = result_cache.get(key)
+    if lines is not None:
+        return iter(lines), True
+    stream = open_query_stream(engine, sql, max_rows, max_bytes)
+    return result_cache.record(key, connection_id, stream), False
+
+
+def _stream_rows(connection, result, max_rows: int, max_bytes: int) -> Iterator[bytes]:
+    row_count = 0
+    truncated = None
+    try:
+        line = _encode({"columns": list(result.keys())})
+        sent_bytes = len(line)
+        yield line
+        for partition in result.partitions():
+            for row in partition:
+                if row_count >= max_rows:
+                    truncated = "max_rows"
+                    break
+                line = _encode(list(row))
+                if sent_bytes + len(line) > max_bytes:
+                    truncated = "max_bytes"
+                    break
+                sent_bytes += len(line)
+                row_count += 1
+                yield line
+            if truncated:
+                break
+        yield _encode({"done": True, "row_count": row_count, "truncated": truncated})
+    except Exception as e:
+        yield _encode({"error": str(e), "row_count": row_count})
+    finally:
+        result.close()
+        _close(connection)
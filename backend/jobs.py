@@ -0,0 +1,317 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+
+from backend.database import ESTIMATE_UNKNOWN, append_schema_tables, build_connection_url, get_saved_connection_engine, load_connection_metadata, read_table_estimates, remove_missing_tables, save_column_profiles, start_saved_connection
+from backend.engines import get_engine, normalize_url
+from backend.metrics import record_reflection
+from backend.profiling import profile_table, profiling_engine
+from backend.reflection import get_table_signatures, iter_schema_bulk, reflect_foreign_keys, reflect_schema_parallel
+
+# Background reflection jobs.
+# A connect request is queued on a bounded worker pool and returns a job id at once. The
+# job streams tables out of the catalog and persists them in chunks, so a cancelled or
+# failed job leaves a partial snapshot that a later refresh completes. A database that is
+# already saved is updated in place rather than copied. Profiling jobs for a saved
+# connection run on the same pool, one table at a time.
+JOB_WORKERS = int(os.getenv("DATASCOUT_JOB_WORKERS", "2"))
+JOB_CHUNK_TABLES = int(os.getenv("DATASCOUT_JOB_CHUNK_TABLES", "500"))
+JOB_HISTORY = int(os.getenv("DATASCOUT_JOB_HISTORY", "100"))
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+
+class Cancelled(Exception):
+    pass
+
+
+class ReflectionJob:
+    kind = "reflect"
+
+    def __init__(self, job_id: str, key: str, db_type: str, connection_data: Dict[str, Any]):
+        self.id = job_id
+        self.key = key
+        self.db_type = db_type
+        self.connection_data = connection_data
+        self.status = "queued"
+        self.tables_total: Optional[int] = None
+        self.tables_done = 0
+        self.connection_id: Optional[int] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.version = 0
+        self.cancel_requested = threading.Event()
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Credentials stay out of job status.
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "db_type": self.db_type,
+            "status": self.status,
+            "tables_total": self.tables_total,
+            "tables_done": self.tables_done,
+            "progress": round(self.tables_done / self.tables_total, 4) if self.tables_total else None,
+            "connection_id": self.connection_id,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class ProfileJob(ReflectionJob):
+    kind = "profile"
+
+    def __init__(self, job_id: str, key: str, db_type: str, connection_id: int, table_names: Optional[List[str]]):
+        super().__init__(job_id, key, db_type, {})
+        self.connection_id = connection_id
+        self.table_names = table_names
+
+
+_jobs: "OrderedDict[str, ReflectionJob]" = OrderedDict()
+_active: Dict[str, str] = {} # normalized target URL (or profile:<connection id>) -> id of its queued or running job
+_lock = threading.Lock()
+_changed = threading.Condition(_lock)
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="datascout-reflect")
+_listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+
+def add_listener(callback: Callable[[Dict[str, Any]], None]):
+    """Call ``callback`` with the status of every job that finishes (e.g. to drop stale caches)."""
+    _listeners.append(callback)
+
+
+def _update(job: ReflectionJob, **fields):
+    with _lock:
+        for name, value in fields.items():
+            setattr(job, name, value)
+        job.version += 1
+        if job.status in TERMINAL_STATUSES:
+            job.finished_at = job.finished_at or time.time()
+            if _active.get(job.key) == job.id:
+                del _active[job.key]
+        _changed.notify_all()
+        finished = job.to_dict() if job.status in TERMINAL_STATUSES else None
+    if finished is not None:
+        for callback in _listeners:
+            try:
+                callback(finished)
+            except Exception as e:
+                print(f"Error in job listener: {e}")
+
+
+def _trim_history():
+    # Caller must hold _lock. Only finished jobs are dropped.
+    finished = [job_id for job_id, job in _jobs.items() if job.status in TERMINAL_STATUSES]
+    for job_id in finished[:max(0, len(_jobs) - JOB_HISTORY)]:
+        del _jobs[job_id]
+
+
+def submit(db_type: str, connection_data: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+    """Queue reflection of a target, or return the job already running for it.
+
+    Returns the job status and whether it was deduplicated.
+    """
+    url = build_connection_url(db_type, connection_data)
+    key = normalize_url(url)
+    with _lock:
+        existing = _active.get(key)
+        if existing is not None:
+            return _jobs[existing].to_dict(), True
+        job = ReflectionJob(uuid.uuid4().hex, key, db_type, dict(connection_data))
+        _jobs[job.id] = job
+        _active[key] = job.id
+        _trim_history()
+        status = job.to_dict()
+    _executor.submit(_run, job, url)
+    return status, False
+
+
+def submit_profile(connection_id: int, table_names: List[str] = None) -> Optional[Tuple[Dict[str, Any], bool]]:
+    """Queue column profiling of a saved connection, or return the profiling job already running for it.
+
+    Profiles ``table_names`` only when given. Returns None if the connection does not exist.
+    """
+    engine = get_saved_connection_engine(connection_id)
+    if engine is None:
+        return None
+    key = f"profile:{connection_id}"
+    with _lock:
+        existing = _active.get(key)
+        if existing is not None:
+            return _jobs[existing].to_dict(), True
+        job = ProfileJob(uuid.uuid4().hex, key, engine.dialect.name, connection_id, table_names)
+        _jobs[job.id] = job
+        _active[key] = job.id
+        _trim_history()
+        status = job.to_dict()
+    _executor.submit(_run_profile, job, engine)
+    return status, False
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    with _lock:
+        job = _jobs.get(job_id)
+        return job.to_dict() if job is not None else None
+
+
+def list_jobs() -> List[Dict[str, Any]]:
+    with _lock:
+        return [job.to_dict() for job in reversed(_jobs.values())]
+
+
+def cancel(job_id: str) -> Optional[Dict[str, Any]]:
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return None
+        job.cancel_requested.set()
+        queued = job.status == "queued"
+    if queued:
+        _update(job, status="cancelled")
+    return get_job(job_id)
+
+
+def watch(job_id: str, poll_seconds: float = 15.0) -> Iterator[Dict[str, Any]]:
+    """Yield the job's status on every change until it finishes.
+
+    The current status is repeated every ``poll_seconds`` as a keep-alive.
+    """
+    last_version = None
+    while True:
+        with _lock:
+            job = _jobs.get(job_id)
+            if job is None:
+                return
+            if job.version == last_version:
+                _changed.wait(timeout=poll_seconds)
+            last_version = job.version
+            status = job.to_dict()
+        yield status
+        if status["status"] in TERMINAL_STATUSES:
+            return
+
+
+def _iter_tables(engine: Engine, table_names: List[str], job: ReflectionJob) -> Iterator[Dict[str, Any]]:
+    tables = iter_schema_bulk(engine)
+    if tables is not None:
+        yield from tables
+        return
+    for start in range(0, len(table_names), JOB_CHUNK_TABLES):
+        if job.cancel_requested.is_set():
+            return
+        yield from reflect_schema_parallel(engine, table_names=table_names[start:start + JOB_CHUNK_TABLES])
+
+
+def _run(job: ReflectionJob, url: str):
+    if job.cancel_requested.is_set():
+        _update(job, status="cancelled")
+        return
+    _update(job, status="running", started_at=time.time())
+    started = time.perf_counter()
+    try:
+        engine = get_engine(url)
+        signatures = get_table_signatures(engine)
+        table_names = sorted(signatures) if signatures is not None else inspect(engine).get_table_names()
+        foreign_keys: Dict[str, List[Dict[str, Any]]] = {}
+        for fk in reflect_foreign_keys(engine):
+            foreign_keys.setdefault(fk["table_name"], []).append(fk)
+        estimates = read_table_estimates(engine)
+        _update(job, tables_total=len(table_names))
+        _update(job, connection_id=start_saved_connection(job.db_type, job.connection_data))
+
+        chunk = []
+        done = 0
+        seen = set()
+        tables = _iter_tables(engine, table_names, job)
+        try:
+            for table in tables:
+                table["signature"] = signatures.get(table["name"]) if signatures else None
+                table["foreign_keys"] = foreign_keys.get(table["name"], [])
+                if estimates:
+                    table.update(estimates.get(table["name"]) or ESTIMATE_UNKNOWN)
+                seen.add(table["name"])
+                chunk.append(table)
+                if len(chunk) >= JOB_CHUNK_TABLES:
+                    append_schema_tables(job.connection_id, chunk)
+                    done += len(chunk)
+                    chunk = []
+                    _update(job, tables_done=done)
+                    if job.cancel_requested.is_set():
+                        raise Cancelled()
+        finally:
+            tables.close()
+        if chunk:
+            append_schema_tables(job.connection_id, chunk)
+            done += len(chunk)
+        if job.cancel_requested.is_set():
+            raise Cancelled()
+        # Every table has been seen, so saved tables missing from the source were dropped there.
+        remove_missing_tables(job.connection_id, seen)
+        record_reflection(engine.dialect.name, done, time.perf_counter() - started)
+        _update(job, tables_done=done, status="completed")
+        print(f"Reflection job {job.id} saved {done} tables as connection {job.connection_id}")
+    except Cancelled:
+        _update(job, status="cancelled")
+        print(f"Reflection job {job.id} cancelled after {job.tables_done} tables")
+    except Exception as e:
+        print(f"Error in reflection job {job.id}: {e}")
+        _update(job, status="failed", error=str(e))
+
+
+def _run_profile(job: ProfileJob, engine: Engine):
+    if job.cancel_requested.is_set():
+        _update(job, status="cancelled")
+        return
+    _update(job, status="running", started_at=time.time())
+    profile_engine = None
+    try:
+        metadata = load_connection_metadata(job.connection_id, job.table_names)
+        if metadata is None:
+            raise ValueError("Connection not found")
+        _update(job, tables_total=len(metadata["tables"]))
+        profile_engine = profiling_engine(engine)
+        done = 0
+        failed = []
+        for table in metadata["tables"]:
+            if job.cancel_requested.is_set():
+                raise Cancelled()
+            column_names = [column["name"] for column in table["columns"]]
+            if column_names:
+                try:
+                    save_column_profiles(job.connection_id, table["name"], profile_table(profile_engine, table["name"], column_names))
+                except Exception as e:
+                    # One unreadable table should not stop the rest of the run.
+                    print(f"Error profiling table {table['name']}: {e}")
+                    failed.append(table["name"])
+            done += 1
+            _update(job, tables_done=done)
+        error = f"Could not profile {len(failed)} tables: {', '.join(failed[:10])}" if failed else None
+        _update(job, status="completed", error=error)
+        print(f"Profiling job {job.id} profiled {done - len(failed)} tables of connection {job.connection_id}")
+    except Cancelled:
+        _update(job, status="cancelled")
+        print(f"Profiling job {job.id} cancelled after {job.tables_done} tables")
+    except Exception as e:
+        print(f"Error in profiling job {job.id}: {e}")
+        _update(job, status="failed", error=str(e))
+    finally:
+        if profile_engine is not None and profile_engine is not engine:
+            profile_engine.dispose()
+
+
+def shutdown():
+    with _lock:
+        for job in _jobs.values():
+            job.cancel_requested.set()
+    _executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,208 @@
+import os
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, List, Optional
+
+# Foreign-key join graph per saved connection.
+# Tables are nodes and each foreign-key constraint is an undirected edge. Connected
+# components are labelled when the graph is built, so unrelated tables are answered
+# without a search, and BFS parent trees are kept per source table.
+JOIN_GRAPH_CACHE_MAX_CONNECTIONS = int(os.getenv("DATASCOUT_JOIN_GRAPH_CACHE_MAX_CONNECTIONS", "64"))
+# Graphs up to this many tables get every BFS tree precomputed (memory grows with tables squared).
+JOIN_PRECOMPUTE_MAX_TABLES = int(os.getenv("DATASCOUT_JOIN_PRECOMPUTE_MAX_TABLES", "500"))
+JOIN_TREE_CACHE_SIZE = int(os.getenv("DATASCOUT_JOIN_TREE_CACHE_SIZE", "256"))
+
+
+def group_constraints(foreign_keys: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Fold one-row-per-column foreign keys into one edge per constraint."""
+    edges = OrderedDict()
+    for fk in foreign_keys:
+        key = (fk["table_name"], fk["constraint_name"], fk["referred_table"])
+        edge = edges.get(key)
+        if edge is None:
+            edge = edges[key] = {
+                "constraint_name": fk["constraint_name"],
+                "table": fk["table_name"],
+                "columns": [],
+                "referred_table": fk["referred_table"],
+                "referred_columns": []
+            }
+        edge["columns"].append(fk["column_name"])
+        edge["referred_columns"].append(fk["referred_column"])
+    return list(edges.values())
+
+
+class JoinGraph:
+    """Adjacency lists over foreign keys with cached shortest join paths."""
+
+    def __init__(self, foreign_keys: List[Dict[str, Any]], table_names: List[str] = ()):
+        self.edges = group_constraints(foreign_keys)
+        self.adjacency: Dict[str, Dict[str, Dict[str, Any]]] = {name: {} for name in table_names}
+        for edge in self.edges:
+            source, target = edge["table"], edge["referred_table"]
+            self.adjacency.setdefault(source, {})
+            self.adjacency.setdefault(target, {})
+            if source == target:
+                continue
+            # Keep the first constraint between two tables; sorted input makes this stable.
+            self.adjacency[source].setdefault(target, edge)
+            self.adjacency[target].setdefault(source, edge)
+        self.component = self._label_components()
+        self._trees: "OrderedDict[str, Dict[str, Optional[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        if len(self.adjacency) <= JOIN_PRECOMPUTE_MAX_TABLES:
+            for name in self.adjacency:
+                self._trees[name] = self._bfs(name)
+
+    def _label_components(self) -> Dict[str, int]:
+        component = {}
+        for start in self.adjacency:
+            if start in component:
+                continue
+            label = len(component)
+            component[start] = label
+            queue = deque([start])
+            while queue:
+                node = queue.popleft()
+                for neighbor in self.adjacency[node]:
+                    if neighbor not in component:
+                        component[neighbor] = label
+                        queue.append(neighbor)
+        return component
+
+    def _bfs(self, source: str) -> Dict[str, Optional[str]]:
+        parents = {source: None}
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            for neighbor in self.adjacency[node]:
+                if neighbor not in parents:
+                    parents[neighbor] = node
+                    queue.append(neighbor)
+        return parents
+
+    def _tree(self, source: str) -> Dict[str, Optional[str]]:
+        with self._lock:
+            parents = self._trees.get(source)
+            if parents is not None:
+                self._trees.move_to_end(source)
+                return parents
+        parents = self._bfs(source)
+        with self._lock:
+            self._trees[source] = parents
+            limit = max(JOIN_TREE_CACHE_SIZE, JOIN_PRECOMPUTE_MAX_TABLES)
+            while len(self._trees) > limit:
+                self._trees.popitem(last=False)
+        return parents
+
+    def has_table(self, name: str) -> bool:
+        return name in self.adjacency
+
+    def shortest_path(self, source: str, target: str) -> Optional[List[Dict[str, Any]]]:
+        """Return the join steps from ``source`` to ``target``, or None if they are not connected."""
+        if self.component[source] != self.component[target]:
+            return None
+        parents = self._tree(target)
+        steps = []
+        node = source
+        # Walking the tree rooted at the target yields the path in source-to-target order.
+        while node != target:
+            parent = parents[node]
+            edge = self.adjacency[node][parent]
+            if edge["table"] == node:
+                steps.append(_step(node, edge["columns"], parent, edge["referred_columns"], edge["constraint_name"]))
+            else:
+                steps.append(_step(node, edge["referred_columns"], parent, edge["columns"], edge["constraint_name"]))
+            node = parent
+        return steps
+
+
+def _step(from_table: str, from_columns: List[str], to_table: str, to_columns: List[str],
+          constraint_name: str) -> Dict[str, Any]:
+    return {
+        "from_table": from_table,
+        "from_columns": list(from_columns),
+        "to_table": to_table,
+        "to_columns": list(to_columns),
+        "constraint_name": constraint_name
+    }
+
+
+_graphs: "OrderedDict[int, JoinGraph]" = OrderedDict()
+# Bumped by every invalidation, so a graph loaded across one is not cached.
+_generations: Dict[int, int] = {}
+_epoch = 0
+_lock = threading.Lock()
+
+
+def _generation(connection_id: int) -> tuple:
+    return _epoch, _generations.get(connection_id, 0)
+
+
+def _bump(connection_id: int):
+    _generations[connection_id] = _generations.get(connection_id, 0) + 1
+
+
+def get_graph(connection_id: int, load: Callable[[int], Optional[Dict[str, Any]]]) -> Optional[JoinGraph]:
+    """Return the connection's join graph, building it from ``load`` on a cache miss.
+
+    ``load`` returns ``{"tables": [...], "foreign_keys": [...]}`` or None if the connection does not exist.
+    """
+    with _lock:
+        graph = _graphs.get(connection_id)
+        if graph is not None:
+            _graphs.move_to_end(connection_id)
+            return graph
+        generation = _generation(connection_id)
+    # Loaded outside the lock; an invalidation meanwhile means this copy may be stale.
+    data = load(connection_id)
+    if data is None:
+        return None
+    graph = JoinGraph(data["foreign_keys"], data["tables"])
+    with _lock:
+        if _generation(connection_id) != generation:
+            return graph
+        _graphs[connection_id] = graph
+        while len(_graphs) > JOIN_GRAPH_CACHE_MAX_CONNECTIONS:
+            _graphs.popitem(last=False)
+    return graph
+
+
+def find_join_path(connection_id: int, source: str, target: str,
+                   load: Callable[[int], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    """Return the shortest foreign-key join path between two tables.
+
+    Returns None if the connection does not exist and raises ValueError for unknown tables.
+    """
+    graph = get_graph(connection_id, load)
+    if graph is None:
+        return None
+    for name in (source, target):
+        if not graph.has_table(name):
+            raise ValueError(f"Table {name} not found")
+    path = graph.shortest_path(source, target)
+    return {
+        "source": source,
+        "target": target,
+        "connected": path is not None,
+        "hops": len(path) if path is not None else None,
+        "path": path or []
+    }
+
+
+def get_relationships(connection_id: int, load: Callable[[int], Optional[Dict[str, Any]]]) -> Optional[List[Dict[str, Any]]]:
+    graph = get_graph(connection_id, load)
+    return graph.edges if graph is not None else None
+
+
+def invalidate(connection_id: int):
+    with _lock:
+        _bump(connection_id)
+        _graphs.pop(connection_id, None)
+
+
+def clear():
+    global _epoch
+    with _lock:
+        _epoch += 1
+        _graphs.clear()
@@ -1,8 +1,18 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from backend.database import get_sqlite_schema, get_mysql_schema, get_postgresql_schema, get_mssql_schema, init_db, save_connection_details, update_table_context, update_column_description, update_global_context, drop_internal_tables
-from backend.models import DatabaseSchemaResponse, SQLiteConnection, DBConnection
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from backend.database import get_sqlite_schema, get_mysql_schema, get_postgresql_schema, get_mssql_schema, init_db, save_schema_snapshot, update_table_context, update_column_description, update_global_context, delete_saved_connection, dispose_internal_db_engine, refresh_connection_schema, apply_metadata_changes, get_saved_connection_engine, compute_schema_fingerprint, load_connection_metadata, load_join_graph_data, summarize_schema, list_saved_tables, list_saved_connections, resume_connection, prewarm_connection_pools
+from backend.engines import dispose_all
+from backend.execution import open_cached_query_stream
+from backend.responses import schema_response, ndjson_response, dumps
+from backend import compact_schema, jobs, join_graph, maintenance, metrics, result_cache, schema_context, schema_index
+from backend.metrics import span
+from backend.sql_guard import guard_cache_info
+from backend.models import DatabaseSummaryResponse, TablePageResponse, SavedTableResponse, SavedConnectionSummary, ResumedConnectionResponse, SQLiteConnection, DBConnection
 from pydantic import BaseModel
+import threading
+import time
+from typing import List, Literal, Optional
 
 app = FastAPI(title="DataScout API")
 
@@ -14,73 +24,286 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def timing_middleware(request: Request, call_next):
+    started = time.perf_counter()
+    spans = metrics.start_request()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - started
+    route = request.scope.get("route")
+    metrics.REQUEST_DURATION.observe(
+        elapsed, method=request.method, route=route.path if route else "unmatched", status=response.status_code
+    )
+    response.headers["Server-Timing"] = metrics.server_timing(spans, elapsed)
+    return response
+
+def collect_cache_metrics():
+    stats = result_cache.cache_stats()
+    yield "# TYPE datascout_result_cache_requests_total counter"
+    yield f'datascout_result_cache_requests_total{{result="hit"}} {stats["hits"]}'
+    yield f'datascout_result_cache_requests_total{{result="miss"}} {stats["misses"]}'
+    yield "# TYPE datascout_result_cache_hit_ratio gauge"
+    yield f"datascout_result_cache_hit_ratio {stats['hit_ratio']}"
+    yield "# TYPE datascout_result_cache_bytes gauge"
+    yield f"datascout_result_cache_bytes {stats['bytes']}"
+    guard = guard_cache_info()
+    lookups = guard.hits + guard.misses
+    yield "# TYPE datascout_sql_guard_cache_hit_ratio gauge"
+    yield f"datascout_sql_guard_cache_hit_ratio {guard.hits / lookups if lookups else 0.0}"
+
+metrics.register_collector(collect_cache_metrics)
+
+def cached_metadata(connection_id: int, table_names: List[str] = None):
+    # Prompt context and relevance index are built from the compact metadata cache.
+    return compact_schema.get_metadata(connection_id, load_connection_metadata, table_names)
+
+def schema_fingerprint(connection_id: int) -> str:
+    # Keys cached query results and tells whether a relevance index on disk matches the saved schema.
+    return result_cache.get_schema_fingerprint(connection_id, compute_schema_fingerprint)
+
+def invalidate_connection_caches(connection_id: int):
+    result_cache.invalidate_connection(connection_id)
+    compact_schema.invalidate(connection_id)
+    schema_context.invalidate(connection_id)
+    schema_index.invalidate(connection_id)
+    join_graph.invalidate(connection_id)
+
+def persist_schema(db_type: str, details: dict, schema) -> Optional[dict]:
+    with span("persist"):
+        result = save_schema_snapshot(db_type, details, schema)
+    if result is None:
+        return None
+    # Reconnecting reuses the saved connection, so its caches are stale if anything changed.
+    if result["added"] or result["changed"] or result["removed"] or result["foreign_keys_changed"]:
+        invalidate_connection_caches(result["connection_id"])
+    elif result["estimates_changed"]:
+        # Only the cached metadata and prompt context carry row estimates.
+        compact_schema.invalidate(result["connection_id"])
+        schema_context.invalidate(result["connection_id"])
+    return result
+
+def connect_summary(db_type: str, details: dict, schema) -> dict:
+    # ``reused`` marks a connection id that was already saved for this database.
+    result = persist_schema(db_type, details, schema)
+    return {
+        "connection_id": result["connection_id"] if result else None,
+        "reused": bool(result and result["reused"]),
+        "tables": summarize_schema(schema)
+    }
+
+def on_job_finished(job: dict):
+    # A job may have updated an existing saved connection in place.
+    if job["connection_id"] is not None:
+        invalidate_connection_caches(job["connection_id"])
+
+jobs.add_listener(on_job_finished)
+
 class ContextUpdate(BaseModel):
     context: str
 
 class DescriptionUpdate(BaseModel):
     description: str
 
+class MetadataChange(BaseModel):
+    kind: Literal["table_context", "column_description", "global_context"]
+    table_name: Optional[str] = None
+    column_name: Optional[str] = None
+    value: str
+
+class MetadataBatch(BaseModel):
+    changes: List[MetadataChange]
+
+class ProfileRequest(BaseModel):
+    table_names: Optional[List[str]] = None
+
+class QueryRequest(BaseModel):
+    sql: str
+    max_rows: Optional[int] = None
+    max_bytes: Optional[int] = None
+
 @app.on_event("startup")
 def startup_event():
     init_db()
+    # Open pools for recently used connections without delaying startup.
+    threading.Thread(target=prewarm_connection_pools, name="datascout-prewarm", daemon=True).start()
+    maintenance.start()
+
+@app.on_event("shutdown")
+def shutdown_event():
+    jobs.shutdown()
+    maintenance.stop()
+    dispose_all()
+    dispose_internal_db_engine()
 
 @app.get("/")
 def read_root():
     return {"message": "DataScout Backend Running"}
 
-@app.delete("/connection")
-def delete_connection():
-    success = drop_internal_tables()
-    if not success:
-        raise HTTPException(status_code=500, detail="Failed to drop tables")
-    
-    # Re-initialize tables
-    init_db()
-    return {"message": "Connection deleted and tables reset"}
+@app.delete("/connection/{connection_id}")
+def delete_saved_connection_endpoint(connection_id: int):
+    # Removes one connection's rows only; other connections stay readable throughout.
+    try:
+        deleted = delete_saved_connection(connection_id)
+    except Exception as e:
+        # The connection stays marked deleted and hidden; the next compaction run finishes removing its rows.
+        invalidate_connection_caches(connection_id)
+        maintenance.request_compaction()
+        raise HTTPException(status_code=500, detail=f"Error deleting connection: {str(e)}")
+    if deleted is None:
+        raise HTTPException(status_code=404, detail="Connection not found")
+    invalidate_connection_caches(connection_id)
+    # Table definitions only this connection used are removed in the background.
+    maintenance.request_compaction()
+    return {"message": "Connection deleted", "deleted": deleted}
+
+@app.get("/maintenance/compaction")
+def compaction_status_endpoint():
+    return maintenance.status()
+
+@app.post("/maintenance/compaction")
+def request_compaction_endpoint():
+    maintenance.request_compaction()
+    return maintenance.status()
+
+@app.get("/connections", response_model=List[SavedConnectionSummary])
+def list_connections_endpoint(limit: int = Query(50, ge=1, le=500)):
+    return list_saved_connections(limit)
+
+@app.post("/connections/{connection_id}/resume", response_model=ResumedConnectionResponse)
+def resume_connection_endpoint(connection_id: int, request: Request):
+    try:
+        result = resume_connection(connection_id)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error resuming connection: {str(e)}")
+    if result is None:
+        raise HTTPException(status_code=404, detail="Connection not found")
+    return schema_response(request, result, ResumedConnectionResponse)
 
-@app.post("/connect/sqlite", response_model=DatabaseSchemaResponse)
-def connect_sqlite(details: SQLiteConnection):
+@app.post("/connect/sqlite", response_model=DatabaseSummaryResponse)
+def connect_sqlite(details: SQLiteConnection, request: Request):
     try:
         schema = get_sqlite_schema(details.path)
         # Save details
-        conn_id = save_connection_details("sqlite", details.dict(), schema)
-        return {"connection_id": conn_id, "tables": schema}
+        return schema_response(request, connect_summary("sqlite", details.dict(), schema), DatabaseSummaryResponse)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error connecting to SQLite: {str(e)}")
 
-@app.post("/connect/mysql", response_model=DatabaseSchemaResponse)
-def connect_mysql(details: DBConnection):
+@app.post("/connect/mysql", response_model=DatabaseSummaryResponse)
+def connect_mysql(details: DBConnection, request: Request):
     try:
         schema = get_mysql_schema(details.host, details.port, details.username, details.password, details.database)
-        conn_id = save_connection_details("mysql", details.dict(), schema)
-        return {"connection_id": conn_id, "tables": schema}
+        return schema_response(request, connect_summary("mysql", details.dict(), schema), DatabaseSummaryResponse)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error connecting to MySQL: {str(e)}")
 
-@app.post("/connect/postgresql", response_model=DatabaseSchemaResponse)
-def connect_postgresql(details: DBConnection):
+@app.post("/connect/postgresql", response_model=DatabaseSummaryResponse)
+def connect_postgresql(details: DBConnection, request: Request):
     try:
         schema = get_postgresql_schema(details.host, details.port, details.username, details.password, details.database)
-        conn_id = save_connection_details("postgresql", details.dict(), schema)
-        return {"connection_id": conn_id, "tables": schema}
+        return schema_response(request, connect_summary("postgresql", details.dict(), schema), DatabaseSummaryResponse)
     except Exception as e:
         print(f"DEBUG: PostgreSQL Connection Error: {e}")
         raise HTTPException(status_code=400, detail=f"Error connecting to PostgreSQL: {str(e)}")
 
-@app.post("/connect/mssql", response_model=DatabaseSchemaResponse)
-def connect_mssql(details: DBConnection):
+@app.post("/connect/mssql", response_model=DatabaseSummaryResponse)
+def connect_mssql(details: DBConnection, request: Request):
     try:
         schema = get_mssql_schema(details.host, details.port, details.username, details.password, details.database)
-        conn_id = save_connection_details("mssql", details.dict(), schema)
-        return {"connection_id": conn_id, "tables": schema}
+        return schema_response(request, connect_summary("mssql", details.dict(), schema), DatabaseSummaryResponse)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error connecting to MSSQL: {str(e)}")
 
+@app.post("/connect/sqlite/async", status_code=202)
+def connect_sqlite_async(details: SQLiteConnection):
+    try:
+        job, deduplicated = jobs.submit("sqlite", details.dict())
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error starting reflection job: {str(e)}")
+    return {**job, "deduplicated": deduplicated}
+
+@app.post("/connect/{db_type}/async", status_code=202)
+def connect_async(db_type: Literal["mysql", "postgresql", "mssql"], details: DBConnection):
+    try:
+        job, deduplicated = jobs.submit(db_type, details.dict())
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error starting reflection job: {str(e)}")
+    return {**job, "deduplicated": deduplicated}
+
+@app.get("/jobs")
+def list_jobs_endpoint():
+    return jobs.list_jobs()
+
+@app.get("/jobs/{job_id}")
+def get_job_endpoint(job_id: str):
+    job = jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/jobs/{job_id}/events")
+def job_events_endpoint(job_id: str):
+    if jobs.get_job(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    # One NDJSON line per status change, ending when the job finishes.
+    events = (dumps(status) + b"\n" for status in jobs.watch(job_id))
+    return StreamingResponse(events, media_type="application/x-ndjson")
+
+@app.delete("/jobs/{job_id}")
+def cancel_job_endpoint(job_id: str):
+    job = jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/schema/{connection_id}/tables", response_model=TablePageResponse)
+def list_tables_endpoint(connection_id: int, request: Request, prefix: Optional[str] = None, cursor: Optional[str] = None,
+                         limit: int = Query(50, ge=1, le=500)):
+    try:
+        page = list_saved_tables(connection_id, prefix, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if page is None:
+        raise HTTPException(status_code=404, detail="Connection not found")
+    return schema_response(request, page, TablePageResponse)
+
+@app.get("/schema/{connection_id}/tables/{table_name}", response_model=SavedTableResponse)
+def get_table_endpoint(connection_id: int, table_name: str, request: Request):
+    table = compact_schema.get_table(connection_id, table_name, load_connection_metadata)
+    if table is None:
+        raise HTTPException(status_code=404, detail="Table not found")
+    return schema_response(request, table, SavedTableResponse)
+
+@app.post("/schema/{connection_id}/refresh")
+def refresh_schema_endpoint(connection_id: int):
+    try:
+        result = refresh_connection_schema(connection_id)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error refreshing schema: {str(e)}")
+    if result is None:
+        raise HTTPException(status_code=404, detail="Connection not found")
+    invalidate_connection_caches(connection_id)
+    return result
+
+@app.post("/schema/{connection_id}/profile", status_code=202)
+def profile_schema_endpoint(connection_id: int, request: Optional[ProfileRequest] = None):
+    # Sampled column statistics are stored with the snapshot; caches drop when the job finishes.
+    try:
+        submitted = jobs.submit_profile(connection_id, request.table_names if request else None)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error starting profiling job: {str(e)}")
+    if submitted is None:
+        raise HTTPException(status_code=404, detail="Connection not found")
+    job, deduplicated = submitted
+    return {**job, "deduplicated": deduplicated}
+
 @app.put("/schema/{connection_id}/table/{table_name}/context")
 def update_table_context_endpoint(connection_id: int, table_name: str, update: ContextUpdate):
     success = update_table_context(connection_id, table_name, update.context)
     if not success:
         raise HTTPException(status_code=404, detail="Table or connection not found")
+    compact_schema.on_table_context_updated(connection_id, table_name, update.context)
+    schema_context.on_table_context_updated(connection_id, table_name, update.context)
+    schema_index.on_tables_updated(connection_id, [table_name], cached_metadata)
     return {"message": "Context updated"}
 
 @app.put("/schema/{connection_id}/column/{table_name}/{column_name}/description")
@@ -88,11 +311,113 @@ def update_column_description_endpoint(connection_id: int, table_name: str, colu
     success = update_column_description(connection_id, table_name, column_name, update.description)
     if not success:
         raise HTTPException(status_code=404, detail="Column, table or connection not found")
+    compact_schema.on_column_description_updated(connection_id, table_name, column_name, update.description)
+    schema_context.on_column_description_updated(connection_id, table_name, column_name, update.description)
+    schema_index.on_tables_updated(connection_id, [table_name], cached_metadata)
     return {"message": "Description updated"}
 
+@app.put("/schema/{connection_id}/batch")
+def apply_metadata_batch_endpoint(connection_id: int, batch: MetadataBatch):
+    for change in batch.changes:
+        if change.kind != "global_context" and not change.table_name:
+            raise HTTPException(status_code=422, detail=f"{change.kind} changes require table_name")
+        if change.kind == "column_description" and not change.column_name:
+            raise HTTPException(status_code=422, detail="column_description changes require column_name")
+    try:
+        results = apply_metadata_changes(connection_id, [change.dict() for change in batch.changes])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error applying metadata changes: {str(e)}")
+    if results is None:
+        raise HTTPException(status_code=404, detail="Connection not found")
+    touched_tables = set()
+    for change, result in zip(batch.changes, results):
+        if result["status"] != "updated":
+            continue
+        if change.kind != "global_context":
+            touched_tables.add(change.table_name)
+        if change.kind == "table_context":
+            compact_schema.on_table_context_updated(connection_id, change.table_name, change.value)
+            schema_context.on_table_context_updated(connection_id, change.table_name, change.value)
+        elif change.kind == "column_description":
+            compact_schema.on_column_description_updated(connection_id, change.table_name, change.column_name, change.value)
+            schema_context.on_column_description_updated(connection_id, change.table_name, change.column_name, change.value)
+        else:
+            compact_schema.on_global_context_updated(connection_id, change.value)
+            schema_context.on_global_context_updated(connection_id, change.value)
+    if touched_tables:
+        schema_index.on_tables_updated(connection_id, sorted(touched_tables), cached_metadata)
+    return {"results": results}
+
 @app.put("/schema/{connection_id}/global/context")
 def update_global_context_endpoint(connection_id: int, update: ContextUpdate):
     success = update_global_context(connection_id, update.context)
     if not success:
         raise HTTPException(status_code=404, detail="Connection not found")
+    compact_schema.on_global_context_updated(connection_id, update.context)
+    schema_context.on_global_context_updated(connection_id, update.context)
     return {"message": "Global context updated"}
+
+@app.get("/schema/{connection_id}/relevant")
+def relevant_tables_endpoint(connection_id: int, question: str, k: int = 10, fuzzy: bool = True):
+    result = schema_index.search(connection_id, question, cached_metadata, schema_fingerprint, k, fuzzy)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Connection not found")
+    return result
+
+@app.get("/schema/{connection_id}/prompt")
+def schema_prompt_endpoint(connection_id: int, token_budget: Optional[int] = None, question: Optional[str] = None, k: int = 10):
+    table_names = None
+    if question:
+        # Only the top-k tables relevant to the question go into the prompt.
+        result = schema_index.search(connection_id, question, cached_metadata, schema_fingerprint, k)
+        if result is None:
+            raise HTTPException(status_code=404, detail="Connection not found")
+        table_names = [table["name"] for table in result["tables"]]
+    context = schema_context.get_schema_context(connection_id, cached_metadata, token_budget, table_names)
+    if context is None:
+        raise HTTPException(status_code=404, detail="Connection not found")
+    return context
+
+@app.get("/schema/{connection_id}/relationships")
+def relationships_endpoint(connection_id: int):
+    edges = join_graph.get_relationships(connection_id, load_join_graph_data)
+    if edges is None:
+        raise HTTPException(status_code=404, detail="Connection not found")
+    return {"relationships": edges}
+
+@app.get("/schema/{connection_id}/join-path")
+def join_path_endpoint(connection_id: int, source: str, target: str):
+    try:
+        result = join_graph.find_join_path(connection_id, source, target, load_join_graph_data)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Connection not found")
+    return result
+
+@app.post("/query/{connection_id}")
+def execute_query_endpoint(connection_id: int, query: QueryRequest, request: Request):
+    engine = get_saved_connection_engine(connection_id)
+    if engine is None:
+        raise HTTPException(status_code=404, detail="Connection not found")
+    try:
+        fingerprint = schema_fingerprint(connection_id)
+        stream, hit = open_cached_query_stream(connection_id, engine, query.sql, fingerprint, query.max_rows, query.max_bytes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error executing query: {str(e)}")
+    return ndjson_response(request, stream, {"X-Cache": "HIT" if hit else "MISS"})
+
+@app.get("/metrics")
+def metrics_endpoint():
+    return PlainTextResponse(metrics.render_metrics(), media_type="text/plain; version=0.0.4")
+
+@app.get("/cache/stats")
+def cache_stats_endpoint():
+    return result_cache.cache_stats()
+
+@app.delete("/cache/{connection_id}")
+def invalidate_cache_endpoint(connection_id: int):
+    result_cache.invalidate_connection(connection_id)
+    return {"message": "Cache invalidated"}
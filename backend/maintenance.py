@@ -0,0 +1,84 @@
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from backend.database import compact_internal_store, delete_saved_connection, pending_connection_deletes
+
+# Background compaction of the internal store.
+# One daemon thread runs compact_internal_store on a fixed interval, and sooner when asked
+# (e.g. after a connection is deleted). Runs never overlap. Each run first finishes connection
+# deletes that stopped part-way, so their rows do not outlive a failure or restart.
+COMPACTION_INTERVAL_SECONDS = int(os.getenv("DATASCOUT_COMPACTION_INTERVAL", "3600")) # 0 runs only on request
+
+_wake = threading.Event()
+_stop = threading.Event()
+_lock = threading.Lock()
+_thread: Optional[threading.Thread] = None
+_running = False
+_last_run: Optional[Dict[str, Any]] = None
+
+
+def run_compaction() -> Dict[str, Any]:
+    global _running, _last_run
+    with _lock:
+        _running = True
+    started = time.time()
+    try:
+        resumed = [connection_id for connection_id in pending_connection_deletes() if delete_saved_connection(connection_id) is not None]
+        result = {"status": "completed", "deletes_resumed": len(resumed), **compact_internal_store()}
+        print(f"Compacted internal store: {result['definitions_deleted']} unused table definitions removed")
+    except Exception as e:
+        print(f"Error compacting internal store: {e}")
+        result = {"status": "failed", "error": str(e)}
+    result.update(started_at=started, finished_at=time.time())
+    with _lock:
+        _running = False
+        _last_run = result
+    return result
+
+
+def _loop():
+    while not _stop.is_set():
+        _wake.wait(timeout=COMPACTION_INTERVAL_SECONDS or None)
+        if _stop.is_set():
+            return
+        _wake.clear()
+        run_compaction()
+
+
+def start():
+    global _thread
+    with _lock:
+        if _thread is not None:
+            return
+        _stop.clear()
+        _thread = threading.Thread(target=_loop, name="datascout-compaction", daemon=True)
+        _thread.start()
+    try:
+        if pending_connection_deletes():
+            _wake.set()
+    except Exception as e:
+        print(f"Error checking for unfinished connection deletes: {e}")
+
+
+def request_compaction():
+    """Wake the compaction thread; requests made while a run is in progress trigger one more run."""
+    _wake.set()
+
+
+def status() -> Dict[str, Any]:
+    with _lock:
+        return {
+            "interval_seconds": COMPACTION_INTERVAL_SECONDS,
+            "running": _running,
+            "last_run": dict(_last_run) if _last_run else None
+        }
+
+
+def stop():
+    global _thread
+    _stop.set()
+    _wake.set()
+    with _lock:
+        _thread = None
@@ -0,0 +1,181 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# In-process metrics with Prometheus text exposition, and per-request timing spans.
+# Recording a value is a perf_counter call, a bisect and a short critical section,
+# so instrumentation stays on in production.
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_registry: List["_Metric"] = []
+_collectors: List[Callable[[], Iterable[str]]] = []
+_lock = threading.Lock()
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.series: Dict[Tuple[str, ...], object] = {}
+        with _lock:
+            _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with _lock:
+            self.series[key] = self.series.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with _lock:
+            series = list(self.series.items())
+        lines.extend(f"{self.name}{_format_labels(self.labels, key)} {value}" for key, value in series)
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with _lock:
+            self.series[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with _lock:
+            state = self.series.get(key)
+            if state is None:
+                state = self.series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with _lock:
+            series = [(key, (list(state[0]), state[1], state[2])) for key, state in self.series.items()]
+        for key, (counts, total, count) in series:
+            cumulative = 0
+            labels = _format_labels(self.labels, key)
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                bucket_labels = _format_labels(self.labels, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            bucket_labels = _format_labels(self.labels, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{bucket_labels} {count}")
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+def register_collector(collect: Callable[[], Iterable[str]]):
+    """Add a callback that renders exposition lines at scrape time (e.g. cache statistics)."""
+    with _lock:
+        _collectors.append(collect)
+
+
+def render_metrics() -> str:
+    with _lock:
+        metrics = list(_registry)
+        collectors = list(_collectors)
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    for collect in collectors:
+        try:
+            lines.extend(collect())
+        except Exception as e:
+            print(f"Error collecting metrics: {e}")
+    return "\n".join(lines) + "\n"
+
+
+REQUEST_DURATION = Histogram(
+    "datascout_http_request_duration_seconds", "HTTP request latency until response headers.", ("method", "route", "status")
+)
+STAGE_DURATION = Histogram("datascout_stage_duration_seconds", "Time spent in each instrumented stage.", ("stage",))
+POOL_CHECKOUT_WAIT = Histogram(
+    "datascout_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.", ("dialect",)
+)
+TABLES_REFLECTED = Counter("datascout_tables_reflected_total", "Tables reflected from source databases.", ("dialect",))
+REFLECTION_SECONDS = Counter("datascout_reflection_seconds_total", "Time spent reflecting source schemas.", ("dialect",))
+REFLECTION_TIMEOUTS = Counter(
+    "datascout_reflection_timeouts_total", "Tables skipped because per-table reflection timed out.", ("dialect",)
+)
+REFLECTION_RATE = Gauge(
+    "datascout_reflection_tables_per_second", "Tables per second of the latest reflection.", ("dialect",)
+)
+
+_spans: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("datascout_spans", default=None)
+
+
+def start_request() -> List[Tuple[str, float]]:
+    """Begin collecting spans for the current request; the list is shared with worker threads."""
+    spans = []
+    _spans.set(spans)
+    return spans
+
+
+@contextmanager
+def span(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_DURATION.observe(elapsed, stage=stage)
+        spans = _spans.get()
+        if spans is not None:
+            spans.append((stage, elapsed))
+
+
+def record_reflection(dialect: str, tables: int, seconds: float):
+    TABLES_REFLECTED.inc(tables, dialect=dialect)
+    REFLECTION_SECONDS.inc(seconds, dialect=dialect)
+    if seconds > 0:
+        REFLECTION_RATE.set(tables / seconds, dialect=dialect)
+
+
+def server_timing(spans: List[Tuple[str, float]], total: float) -> str:
+    # Repeated stages (e.g. several queries) are summed into one entry.
+    totals: Dict[str, float] = {}
+    for stage, elapsed in spans:
+        totals[stage] = totals.get(stage, 0.0) + elapsed
+    entries = [f"{stage};dur={elapsed * 1000:.2f}" for stage, elapsed in totals.items()]
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
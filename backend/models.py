@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from datetime import datetime
+from typing import List, Dict, Any, Optional
 
 class ColumnSchema(BaseModel):
     name: str
@@ -10,11 +11,81 @@ class ColumnSchema(BaseModel):
 class TableSchema(BaseModel):
     name: str
     columns: List[ColumnSchema]
+    row_estimate: Optional[int] = None
+    size_bytes: Optional[int] = None
 
 class DatabaseSchemaResponse(BaseModel):
     connection_id: int = None
     tables: List[TableSchema]
 
+class TableSummary(BaseModel):
+    name: str
+    column_count: int
+    row_estimate: Optional[int] = None
+    size_bytes: Optional[int] = None
+
+class DatabaseSummaryResponse(BaseModel):
+    connection_id: int = None
+    # True when the database was already saved: the connection id, its descriptions and its
+    # deletion are shared with every other client connected to the same database.
+    reused: bool = False
+    tables: List[TableSummary]
+
+class ColumnProfile(BaseModel):
+    sample_rows: int
+    null_fraction: Optional[float] = None
+    distinct_estimate: Optional[int] = None
+    min_value: Optional[str] = None
+    max_value: Optional[str] = None
+    quantiles: Optional[Dict[str, Any]] = None
+    avg_length: Optional[float] = None
+    profiled_at: Optional[datetime] = None
+
+class SavedColumnSchema(ColumnSchema):
+    description: Optional[str] = None
+    profile: Optional[ColumnProfile] = None
+
+class SavedTableSummary(TableSummary):
+    table_context: Optional[str] = None
+
+class TablePageResponse(BaseModel):
+    tables: List[SavedTableSummary]
+    next_cursor: Optional[str] = None
+
+class ForeignKeySchema(BaseModel):
+    table_name: str
+    constraint_name: Optional[str] = None
+    column_name: str
+    referred_table: str
+    referred_column: str
+
+class SavedTableResponse(BaseModel):
+    name: str
+    table_context: Optional[str] = None
+    columns: List[SavedColumnSchema]
+    foreign_keys: List[ForeignKeySchema] = []
+    row_estimate: Optional[int] = None
+    size_bytes: Optional[int] = None
+
+class SavedConnectionSummary(BaseModel):
+    connection_id: int
+    db_type: str
+    host: Optional[str] = None
+    port: Optional[int] = None
+    database: Optional[str] = None
+    username: Optional[str] = None
+    path: Optional[str] = None
+    table_count: int
+    created_at: Optional[datetime] = None
+    last_used_at: Optional[datetime] = None
+
+class ResumedConnectionResponse(BaseModel):
+    connection_id: int
+    db_type: str
+    database: Optional[str] = None
+    global_context: Optional[str] = None
+    tables: List[SavedTableSummary]
+
 class SQLiteConnection(BaseModel):
     path: str
 
@@ -26,7 +97,7 @@ class DBConnection(BaseModel):
     password: str
 
 # SQLAlchemy ORM Models
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Text, JSON, DateTime
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, Float, ForeignKey, Text, JSON, DateTime, Index
 from sqlalchemy.orm import declarative_base, relationship
 from datetime import datetime
 
@@ -43,10 +114,17 @@ class SavedConnection(Base):
     username = Column(String, nullable=True)
     password = Column(String, nullable=True) # Storing plain text for now as requested
     file_path = Column(String, nullable=True) # For SQLite
+    target_hash = Column(String(64), nullable=True, unique=True, index=True) # sha256 of the database address; one saved connection per target
     global_context = Column(Text, nullable=True)
+    catalog_version = Column(String, nullable=True) # Database-wide DDL counter seen at last refresh
     created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow, index=True) # Set on connect and resume
+    deleted_at = Column(DateTime, nullable=True, index=True) # Set before a delete starts; hidden from readers until its rows are gone
 
     schemas = relationship("SavedSchema", back_populates="connection")
+    column_descriptions = relationship("SavedColumnDescription", back_populates="connection")
+    column_profiles = relationship("SavedColumnProfile", back_populates="connection")
+    foreign_keys = relationship("SavedForeignKey", back_populates="connection")
 
 class SavedSchema(Base):
     __tablename__ = "saved_schemas"
@@ -55,7 +133,100 @@ class SavedSchema(Base):
     connection_id = Column(Integer, ForeignKey("saved_connections.id"))
     table_name = Column(String)
     table_context = Column(Text, nullable=True)
-    columns_json = Column(JSON) # Storing full column details as JSON
+    columns_json = Column(JSON(none_as_null=True), nullable=True) # Legacy column details; migrated into table definitions on startup
+    signature = Column(String, nullable=True) # Catalog change signal for incremental refresh
+    row_estimate = Column(BigInteger, nullable=True) # From catalog statistics, not COUNT(*)
+    size_bytes = Column(BigInteger, nullable=True)
+    definition_id = Column(Integer, ForeignKey("saved_table_definitions.id"), nullable=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     connection = relationship("SavedConnection", back_populates="schemas")
+    definition = relationship("SavedTableDefinition")
+
+    __table_args__ = (
+        Index("ix_saved_schemas_connection_table", "connection_id", "table_name", unique=True),
+    )
+
+class SavedTableDefinition(Base):
+    # Column layout of a table, stored once per distinct content and shared by every snapshot that has it.
+    __tablename__ = "saved_table_definitions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), unique=True, index=True) # sha256 of the ordered column definitions
+    column_count = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    columns = relationship("SavedDefinitionColumn", back_populates="definition")
+
+class SavedDefinitionColumn(Base):
+    __tablename__ = "saved_definition_columns"
+
+    id = Column(Integer, primary_key=True, index=True)
+    definition_id = Column(Integer, ForeignKey("saved_table_definitions.id"))
+    position = Column(Integer) # Ordinal position within the table
+    column_name = Column(String)
+    type = Column(String)
+    nullable = Column(Boolean, default=True)
+    primary_key = Column(Boolean, default=False)
+
+    definition = relationship("SavedTableDefinition", back_populates="columns")
+
+    __table_args__ = (
+        Index("ix_saved_definition_columns_definition_position", "definition_id", "position"),
+    )
+
+class SavedColumnDescription(Base):
+    # User annotations stay per connection, keyed by name, so they survive definition changes.
+    __tablename__ = "saved_column_descriptions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    connection_id = Column(Integer, ForeignKey("saved_connections.id"))
+    table_name = Column(String)
+    column_name = Column(String)
+    description = Column(Text, nullable=True)
+
+    connection = relationship("SavedConnection", back_populates="column_descriptions")
+
+    __table_args__ = (
+        Index("ix_saved_column_descriptions_connection_table_column", "connection_id", "table_name", "column_name", unique=True),
+    )
+
+class SavedColumnProfile(Base):
+    # Approximate statistics from a sampled profiling run; aggregates only, never sampled rows.
+    __tablename__ = "saved_column_profiles"
+
+    id = Column(Integer, primary_key=True, index=True)
+    connection_id = Column(Integer, ForeignKey("saved_connections.id"))
+    table_name = Column(String)
+    column_name = Column(String)
+    sample_rows = Column(Integer)
+    null_fraction = Column(Float, nullable=True)
+    distinct_estimate = Column(Integer, nullable=True)
+    min_value = Column(String, nullable=True)
+    max_value = Column(String, nullable=True)
+    quantiles = Column(JSON, nullable=True)
+    avg_length = Column(Float, nullable=True)
+    profiled_at = Column(DateTime, default=datetime.utcnow)
+
+    connection = relationship("SavedConnection", back_populates="column_profiles")
+
+    __table_args__ = (
+        Index("ix_saved_column_profiles_connection_table_column", "connection_id", "table_name", "column_name", unique=True),
+    )
+
+class SavedForeignKey(Base):
+    __tablename__ = "saved_foreign_keys"
+
+    id = Column(Integer, primary_key=True, index=True)
+    connection_id = Column(Integer, ForeignKey("saved_connections.id"))
+    constraint_name = Column(String)
+    table_name = Column(String)
+    column_name = Column(String)
+    referred_table = Column(String)
+    referred_column = Column(String)
+
+    connection = relationship("SavedConnection", back_populates="foreign_keys")
+
+    __table_args__ = (
+        Index("ix_saved_foreign_keys_connection_table", "connection_id", "table_name"),
+    )
@@ -0,0 +1,362 @@
+import datetime
+import decimal
+import hashlib
+import math
+import os
+import random
+import time
+from operator import itemgetter
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+from backend.engines import build_engine
+
+# Approximate column statistics from a bounded sample of each table.
+# Sampled rows stream once through per-column sketches (HyperLogLog for distinct counts,
+# a KLL-style compactor for quantiles) and only the aggregates leave this module. Each
+# table gets a row budget and a time budget, enforced on the server where the dialect
+# allows it and on the client otherwise.
+PROFILE_SAMPLE_ROWS = int(os.getenv("DATASCOUT_PROFILE_SAMPLE_ROWS", "10000"))
+PROFILE_TABLE_TIMEOUT = float(os.getenv("DATASCOUT_PROFILE_TABLE_TIMEOUT", "10"))
+# Set to 0 to keep only null and distinct statistics (no min/max/quantile values).
+PROFILE_VALUE_RANGES = os.getenv("DATASCOUT_PROFILE_VALUE_RANGES", "1") == "1"
+PROFILE_FETCH_SIZE = 1000
+HLL_PRECISION = 12 # 4096 registers, ~1.6% standard error
+QUANTILE_SKETCH_K = 128
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+SQLITE_PROGRESS_STEPS = 10000 # VM instructions between deadline checks
+MYSQL_SAMPLE_RANGES = 16 # random primary-key ranges per sampled MySQL table
+MYSQL_INTEGER_TYPES = ("tinyint", "smallint", "mediumint", "int", "bigint")
+
+ORDERED_KINDS = ("number", "datetime", "date", "time")
+LENGTH_KINDS = ("text", "binary")
+
+
+class HyperLogLog:
+    __slots__ = ("precision", "registers")
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value: Any):
+        digest = hashlib.blake2b(_value_key(value), digest_size=8).digest()
+        hashed = int.from_bytes(digest, "big")
+        width = 64 - self.precision
+        index = hashed >> width
+        rank = width - (hashed & ((1 << width) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> int:
+        m = len(self.registers)
+        estimate = (0.7213 / (1 + 1.079 / m)) * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate while many registers are still empty.
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class QuantileSketch:
+    """KLL-style sketch: full levels are sorted and every other item moves up with double weight."""
+    __slots__ = ("k", "levels")
+
+    def __init__(self, k: int = QUANTILE_SKETCH_K):
+        self.k = k
+        self.levels: List[list] = [[]]
+
+    def add(self, value: Any):
+        self.levels[0].append(value)
+        if len(self.levels[0]) >= 2 * self.k:
+            self._compact(0)
+
+    def _compact(self, level: int):
+        items = sorted(self.levels[level])
+        self.levels[level] = []
+        if level + 1 == len(self.levels):
+            self.levels.append([])
+        self.levels[level + 1].extend(items[random.getrandbits(1)::2])
+        if len(self.levels[level + 1]) >= 2 * self.k:
+            self._compact(level + 1)
+
+    def quantiles(self, fractions=QUANTILES) -> List[Any]:
+        weighted = sorted(
+            ((value, 1 << level) for level, items in enumerate(self.levels) for value in items), key=itemgetter(0)
+        )
+        if not weighted:
+            return []
+        total = sum(weight for _, weight in weighted)
+        results = []
+        position = 0
+        cumulative = weighted[0][1]
+        for fraction in fractions:
+            while position < len(weighted) - 1 and cumulative < fraction * total:
+                position += 1
+                cumulative += weighted[position][1]
+            results.append(weighted[position][0])
+        return results
+
+
+def _value_key(value: Any) -> bytes:
+    if isinstance(value, str):
+        return value.encode("utf-8", "surrogatepass")
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value)
+    return str(value).encode("utf-8")
+
+
+def _value_kind(value: Any) -> str:
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float, decimal.Decimal)):
+        return "number"
+    if isinstance(value, datetime.datetime):
+        return "datetime"
+    if isinstance(value, datetime.date):
+        return "date"
+    if isinstance(value, datetime.time):
+        return "time"
+    if isinstance(value, str):
+        return "text"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "binary"
+    return "other"
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, (float, decimal.Decimal)):
+        return float(f"{value:.6g}") # sampled statistics are approximate anyway
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return value
+
+
+class ColumnProfiler:
+    # Text and binary columns only report lengths, so no sampled values are kept for them.
+    __slots__ = ("rows", "nulls", "distinct", "kind", "minimum", "maximum", "sketch", "lengths", "total_length")
+
+    def __init__(self):
+        self.rows = 0
+        self.nulls = 0
+        self.distinct = HyperLogLog()
+        self.kind: Optional[str] = None
+        self.minimum = None
+        self.maximum = None
+        self.sketch = QuantileSketch()
+        self.lengths = 0
+        self.total_length = 0
+
+    def add(self, value: Any):
+        self.rows += 1
+        if value is None:
+            self.nulls += 1
+            return
+        self.distinct.add(value)
+        kind = _value_kind(value)
+        if self.kind is None:
+            self.kind = kind
+        elif kind != self.kind:
+            return # SQLite columns can mix types; ranges describe the first type seen
+        if kind in LENGTH_KINDS:
+            self.lengths += 1
+            self.total_length += len(value)
+        elif kind in ORDERED_KINDS and value == value: # skip NaN
+            if self.minimum is None or value < self.minimum:
+                self.minimum = value
+            if self.maximum is None or value > self.maximum:
+                self.maximum = value
+            self.sketch.add(value)
+
+    def result(self) -> Dict[str, Any]:
+        profile = {
+            "sample_rows": self.rows,
+            "null_fraction": round(self.nulls / self.rows, 4) if self.rows else None,
+            "distinct_estimate": min(self.distinct.count(), self.rows - self.nulls),
+            "min_value": None,
+            "max_value": None,
+            "quantiles": None,
+            "avg_length": round(self.total_length / self.lengths, 1) if self.lengths else None
+        }
+        if PROFILE_VALUE_RANGES and self.minimum is not None:
+            profile["min_value"] = str(_json_value(self.minimum))
+            profile["max_value"] = str(_json_value(self.maximum))
+            profile["quantiles"] = {
+                f"p{round(fraction * 100)}": _json_value(value)
+                for fraction, value in zip(QUANTILES, self.sketch.quantiles(QUANTILES))
+            }
+        return profile
+
+
+# Samplers return the sampling query for one table. Catalog row estimates pick a sampling
+# rate aimed at ``limit`` rows; the LIMIT only guards against stale estimates.
+def _postgresql_sample(connection: Connection, table_name: str, columns: str, limit: int, timeout: float) -> str:
+    table = connection.dialect.identifier_preparer.quote(table_name)
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {max(1, int(timeout * 1000))}")
+    estimate = connection.execute(
+        text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:name)"), {"name": table}
+    ).scalar()
+    if estimate and estimate > limit:
+        # SYSTEM picks random pages, so only the sampled pages are read.
+        return f"SELECT {columns} FROM {table} TABLESAMPLE SYSTEM ({100.0 * limit / estimate:.6f}) LIMIT {limit}"
+    return f"SELECT {columns} FROM {table} LIMIT {limit}"
+
+
+def _mysql_key_range(connection: Connection, table_name: str) -> Optional[tuple]:
+    # (column, min, max) of a single-column integer primary key, read from the ends of the clustered index.
+    keys = connection.execute(text(
+        "SELECT k.COLUMN_NAME, c.DATA_TYPE FROM information_schema.KEY_COLUMN_USAGE k "
+        "JOIN information_schema.COLUMNS c ON c.TABLE_SCHEMA = k.TABLE_SCHEMA AND c.TABLE_NAME = k.TABLE_NAME "
+        "AND c.COLUMN_NAME = k.COLUMN_NAME "
+        "WHERE k.TABLE_SCHEMA = DATABASE() AND k.TABLE_NAME = :name AND k.CONSTRAINT_NAME = 'PRIMARY'"
+    ), {"name": table_name}).all()
+    if len(keys) != 1 or keys[0][1].lower() not in MYSQL_INTEGER_TYPES:
+        return None
+    preparer = connection.dialect.identifier_preparer
+    key = preparer.quote(keys[0][0])
+    low, high = connection.exec_driver_sql(
+        f"SELECT MIN({key}), MAX({key}) FROM {preparer.quote(table_name)}"
+    ).one()
+    return (key, low, high) if low is not None else None
+
+
+def _mysql_sample(connection: Connection, table_name: str, columns: str, limit: int, timeout: float) -> str:
+    # MySQL has no TABLESAMPLE. Large tables with an integer primary key are sampled as a few
+    # short key ranges from random starting points, so only the sampled rows are read; other
+    # tables take the first rows. The hint caps the run time on the server.
+    table = connection.dialect.identifier_preparer.quote(table_name)
+    estimate = connection.execute(
+        text("SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :name"),
+        {"name": table_name}
+    ).scalar()
+    hint = f"/*+ MAX_EXECUTION_TIME({max(1, int(timeout * 1000))}) */"
+    key_range = _mysql_key_range(connection, table_name) if estimate and estimate > limit else None
+    if key_range is None:
+        return f"SELECT {hint} {columns} FROM {table} LIMIT {limit}"
+    key, low, high = key_range
+    ranges = min(MYSQL_SAMPLE_RANGES, limit)
+    per_range = math.ceil(limit / ranges)
+    starts = sorted(random.randint(int(low), int(high)) for _ in range(ranges))
+    parts = " UNION ALL ".join(
+        f"(SELECT {columns} FROM {table} WHERE {key} >= {start} ORDER BY {key} LIMIT {per_range})" for start in starts
+    )
+    return f"SELECT {hint} * FROM ({parts}) AS sample LIMIT {limit}"
+
+
+def _mssql_sample(connection: Connection, table_name: str, columns: str, limit: int, timeout: float) -> str:
+    # T-SQL has no statement time limit, so lock waits are capped on the server and the query
+    # itself by pymssql's timeout on the profiling engine (see PROFILE_CONNECT_ARGS).
+    # _mssql_reset restores the lock timeout for the pool.
+    connection.exec_driver_sql(f"SET LOCK_TIMEOUT {max(1, int(timeout * 1000))}")
+    table = connection.dialect.identifier_preparer.quote(table_name)
+    estimate = connection.execute(
+        text("SELECT SUM(rows) FROM sys.partitions WHERE object_id = OBJECT_ID(:name) AND index_id IN (0, 1)"),
+        {"name": table}
+    ).scalar()
+    if estimate and estimate > limit:
+        return f"SELECT TOP ({limit}) {columns} FROM {table} TABLESAMPLE SYSTEM ({100.0 * limit / estimate:.6f} PERCENT)"
+    return f"SELECT TOP ({limit}) {columns} FROM {table}"
+
+
+def _mssql_reset(connection: Connection):
+    connection.exec_driver_sql("SET LOCK_TIMEOUT -1")
+
+
+def _sqlite_sample(connection: Connection, table_name: str, columns: str, limit: int, timeout: float) -> str:
+    table = connection.dialect.identifier_preparer.quote(table_name)
+    try:
+        max_rowid = connection.exec_driver_sql(f"SELECT max(rowid) FROM {table}").scalar()
+    except DBAPIError:
+        max_rowid = None # WITHOUT ROWID table
+    if max_rowid is None or max_rowid <= 2 * limit:
+        return f"SELECT {columns} FROM {table} ORDER BY random() LIMIT {limit}"
+    # Random rowid lookups touch only the sampled rows instead of sorting the whole table.
+    return (
+        f"WITH RECURSIVE picks(i, id) AS (SELECT 1, abs(random()) % {max_rowid} + 1 "
+        f"UNION ALL SELECT i + 1, abs(random()) % {max_rowid} + 1 FROM picks WHERE i < {limit}) "
+        f"SELECT {columns} FROM {table} WHERE rowid IN (SELECT id FROM picks)"
+    )
+
+
+def _generic_sample(connection: Connection, table_name: str, columns: str, limit: int, timeout: float) -> str:
+    # SQL:2008 row limit; the stream in profile_table also stops at ``limit`` rows.
+    table = connection.dialect.identifier_preparer.quote(table_name)
+    return f"SELECT {columns} FROM {table} FETCH FIRST {limit} ROWS ONLY"
+
+
+SAMPLERS = {
+    "postgresql": _postgresql_sample,
+    "mysql": _mysql_sample,
+    "mariadb": _mysql_sample,
+    "mssql": _mssql_sample,
+    "sqlite": _sqlite_sample
+}
+# Session settings a sampler changed that must not leak into the pooled connection.
+SAMPLE_RESETS = {
+    "mssql": _mssql_reset
+}
+# Driver arguments that bound every query's run time, for dialects that only take the limit at
+# connect time. pymssql's ``timeout`` is in whole seconds.
+PROFILE_CONNECT_ARGS = {
+    "mssql": lambda timeout: {"timeout": max(1, math.ceil(timeout))}
+}
+
+
+def profiling_engine(engine: Engine, timeout: float = None) -> Engine:
+    """Return the engine to profile through: ``engine`` itself, or for dialects listed in
+    PROFILE_CONNECT_ARGS a separate engine to the same database with the time limit set.
+
+    The caller disposes an engine that is not ``engine``.
+    """
+    connect_args = PROFILE_CONNECT_ARGS.get(engine.dialect.name)
+    if connect_args is None:
+        return engine
+    return build_engine(engine.url.render_as_string(hide_password=False),
+                        connect_args=connect_args(timeout or PROFILE_TABLE_TIMEOUT))
+
+
+def profile_table(engine: Engine, table_name: str, column_names: List[str], sample_rows: int = None,
+                  timeout: float = None) -> Dict[str, Dict[str, Any]]:
+    """Profile ``column_names`` of one table from a sample of at most ``sample_rows`` rows.
+
+    Returns one statistics dict per column name. A sample cut short by the time budget is
+    still profiled; only a table that yields no rows before the budget runs out raises.
+    """
+    sample_rows = sample_rows or PROFILE_SAMPLE_ROWS
+    timeout = timeout or PROFILE_TABLE_TIMEOUT
+    deadline = time.monotonic() + timeout
+    profilers = [ColumnProfiler() for _ in column_names]
+    rows = 0
+    with engine.connect() as connection:
+        preparer = connection.dialect.identifier_preparer
+        columns = ", ".join(preparer.quote(name) for name in column_names)
+        dialect = connection.dialect.name
+        driver_connection = connection.connection.driver_connection if dialect == "sqlite" else None
+        if driver_connection is not None:
+            driver_connection.set_progress_handler(lambda: time.monotonic() > deadline, SQLITE_PROGRESS_STEPS)
+        try:
+            sql = SAMPLERS.get(dialect, _generic_sample)(connection, table_name, columns, sample_rows, timeout)
+            result = connection.execution_options(yield_per=PROFILE_FETCH_SIZE).exec_driver_sql(sql)
+            try:
+                for partition in result.partitions():
+                    for row in partition[:sample_rows - rows]:
+                        for profiler, value in zip(profilers, row):
+                            profiler.add(value)
+                    rows = min(sample_rows, rows + len(partition))
+                    if rows >= sample_rows or time.monotonic() > deadline:
+                        break
+            finally:
+                result.close()
+        except DBAPIError as e:
+            if not rows:
+                raise
+            print(f"Profiling {table_name} stopped after {rows} sampled rows: {e}")
+        finally:
+            if driver_connection is not None:
+                driver_connection.set_progress_handler(None, 0)
+            if dialect in SAMPLE_RESETS:
+                SAMPLE_RESETS[dialect](connection)
+    return {name: profiler.result() for name, profiler in zip(column_names, profilers)}
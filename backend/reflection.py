@@ -0,0 +1,551 @@
+import hashlib
+import os
+import re
+import time
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import List, Dict, Any, Optional, Callable, Iterable, Iterator
+
+from sqlalchemy import bindparam, inspect, text, types as sqltypes
+from sqlalchemy.engine import Engine
+
+from backend import metrics
+
+# Set-based schema reflection.
+# Each reflector reads every column of every table in the default schema with a
+# single catalog query, instead of one Inspector round trip per table.
+# Dialects without a bulk query are reflected table by table across a thread pool.
+
+REFLECTION_WORKERS = int(os.getenv("DATASCOUT_REFLECTION_WORKERS", "8"))
+REFLECTION_TABLE_TIMEOUT = float(os.getenv("DATASCOUT_REFLECTION_TABLE_TIMEOUT", "30"))
+
+SQLITE_COLUMNS_SQL = """
+SELECT m.name AS table_name, p.name AS column_name, p.type AS data_type,
+       p."notnull" AS not_null, p.pk AS pk
+FROM sqlite_master AS m
+JOIN pragma_table_info(m.name) AS p
+WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%'
+ORDER BY m.name, p.cid
+"""
+
+POSTGRESQL_COLUMNS_SQL = """
+SELECT c.relname AS table_name, a.attname AS column_name,
+       pg_catalog.format_type(a.atttypid, a.atttypmod) AS data_type,
+       a.attnotnull AS not_null,
+       EXISTS (
+           SELECT 1 FROM pg_catalog.pg_index i
+           WHERE i.indrelid = c.oid AND i.indisprimary AND a.attnum = ANY(i.indkey)
+       ) AS pk
+FROM pg_catalog.pg_class c
+JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+JOIN pg_catalog.pg_attribute a ON a.attrelid = c.oid
+WHERE n.nspname = current_schema()
+  AND c.relkind IN ('r', 'p')
+  AND a.attnum > 0 AND NOT a.attisdropped
+ORDER BY c.relname, a.attnum
+"""
+
+MYSQL_COLUMNS_SQL = """
+SELECT c.TABLE_NAME AS table_name, c.COLUMN_NAME AS column_name,
+       c.COLUMN_TYPE AS data_type, c.IS_NULLABLE = 'NO' AS not_null,
+       c.COLUMN_KEY = 'PRI' AS pk
+FROM information_schema.COLUMNS c
+JOIN information_schema.TABLES t
+  ON t.TABLE_SCHEMA = c.TABLE_SCHEMA AND t.TABLE_NAME = c.TABLE_NAME
+WHERE c.TABLE_SCHEMA = DATABASE() AND t.TABLE_TYPE = 'BASE TABLE'
+ORDER BY c.TABLE_NAME, c.ORDINAL_POSITION
+"""
+
+MSSQL_COLUMNS_SQL = """
+SELECT t.name AS table_name, c.name AS column_name, ty.name AS type_name,
+       c.max_length, c.precision, c.scale,
+       CASE WHEN c.is_nullable = 0 THEN 1 ELSE 0 END AS not_null,
+       CASE WHEN pk.column_id IS NULL THEN 0 ELSE 1 END AS pk
+FROM sys.tables t
+JOIN sys.columns c ON c.object_id = t.object_id
+JOIN sys.types ty ON ty.user_type_id = c.user_type_id
+LEFT JOIN (
+    SELECT ic.object_id, ic.column_id
+    FROM sys.indexes i
+    JOIN sys.index_columns ic ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+    WHERE i.is_primary_key = 1
+) pk ON pk.object_id = c.object_id AND pk.column_id = c.column_id
+WHERE t.schema_id = SCHEMA_ID()
+ORDER BY t.name, c.column_id
+"""
+
+_TYPE_RE = re.compile(r"^([^(]*)(?:\(([^)]*)\))?(.*)$")
+
+
+def format_type(dialect, raw_type: str) -> str:
+    """Render a catalog type string the way the Inspector would (e.g. "VARCHAR(255)")."""
+    return _format_type(type(dialect), raw_type)
+
+
+@lru_cache(maxsize=4096)
+def _format_type(dialect_cls, raw_type: str) -> str:
+    # Wide schemas repeat a handful of type strings, and rendering a type builds a default dialect.
+    if not raw_type:
+        return "NULL"
+    if dialect_cls.name == "sqlite":
+        # SQLite keeps any declared type; the Inspector maps it by affinity (DOUBLE PRECISION -> REAL).
+        return str(dialect_cls()._resolve_type_affinity(raw_type.upper()))
+    match = _TYPE_RE.match(raw_type)
+    if not match:
+        return raw_type.upper()
+    base, args, suffix = match.groups()
+    name = f"{base.strip()} {suffix.strip()}".strip().lower()
+    ischema_names = dialect_cls.ischema_names
+    cls = ischema_names.get(name) or ischema_names.get(name.upper())
+    if cls is None:
+        return raw_type.upper()
+
+    kwargs = {}
+    if name.endswith("with time zone") and "without" not in name:
+        kwargs["timezone"] = True
+    try:
+        params = [int(a) for a in args.split(",")] if args else []
+    except ValueError:
+        return raw_type.upper()
+    try:
+        if params and issubclass(cls, (sqltypes.String, sqltypes.Numeric, sqltypes._Binary)):
+            return str(cls(*params, **kwargs))
+        return str(cls(**kwargs))
+    except Exception:
+        return raw_type.upper()
+
+
+def _mssql_type(row) -> str:
+    name = row.type_name
+    if name in ("char", "varchar", "binary", "varbinary"):
+        return f"{name}({'max' if row.max_length == -1 else row.max_length})"
+    if name in ("nchar", "nvarchar"):
+        return f"{name}({'max' if row.max_length == -1 else row.max_length // 2})"
+    if name in ("decimal", "numeric"):
+        return f"{name}({row.precision},{row.scale})"
+    return name
+
+
+def _iter_grouped(dialect, rows: Iterable, type_of: Callable) -> Iterator[Dict[str, Any]]:
+    # Rows arrive ordered by table, so each table is complete when the next one starts.
+    current = None
+    for row in rows:
+        if current is None or current["name"] != row.table_name:
+            if current is not None:
+                yield current
+            current = {"name": row.table_name, "columns": []}
+        current["columns"].append({
+            "name": row.column_name,
+            "type": format_type(dialect, type_of(row)),
+            "nullable": not bool(row.not_null),
+            "primary_key": bool(row.pk)
+        })
+    if current is not None:
+        yield current
+
+
+def _group_rows(dialect, rows, type_of: Callable) -> List[Dict[str, Any]]:
+    return list(_iter_grouped(dialect, rows, type_of))
+
+
+BULK_COLUMNS_SQL = {
+    "sqlite": (SQLITE_COLUMNS_SQL, lambda row: row.data_type),
+    "postgresql": (POSTGRESQL_COLUMNS_SQL, lambda row: row.data_type),
+    "mysql": (MYSQL_COLUMNS_SQL, lambda row: row.data_type),
+    "mssql": (MSSQL_COLUMNS_SQL, _mssql_type),
+}
+
+
+# Table name column of each bulk query, for reflecting a subset of tables.
+BULK_TABLE_NAME_COLUMNS = {
+    "sqlite": "m.name",
+    "postgresql": "c.relname",
+    "mysql": "c.TABLE_NAME",
+    "mssql": "t.name",
+}
+# Names per filtered query; SQL Server allows about 2100 parameters per statement.
+BULK_FILTER_BATCH = 1000
+
+
+def _filtered_sql(dialect_name: str, sql: str):
+    column = BULK_TABLE_NAME_COLUMNS[dialect_name]
+    filtered = sql.replace("\nORDER BY ", f"\n  AND {column} IN :table_names\nORDER BY ", 1)
+    return text(filtered).bindparams(bindparam("table_names", expanding=True))
+
+
+def reflect_schema_bulk(engine: Engine, table_names: List[str] = None) -> Optional[List[Dict[str, Any]]]:
+    """Reflect all tables and columns in one catalog query.
+
+    Pass ``table_names`` to reflect only those tables; names that no longer exist are
+    left out. Returns None when the dialect has no bulk query, so callers can fall back
+    to the Inspector path.
+    """
+    entry = BULK_COLUMNS_SQL.get(engine.dialect.name)
+    if entry is None:
+        return None
+    sql, type_of = entry
+    with engine.connect() as connection:
+        if table_names is None:
+            rows = connection.execute(text(sql)).fetchall()
+        else:
+            filtered = _filtered_sql(engine.dialect.name, sql)
+            rows = []
+            for start in range(0, len(table_names), BULK_FILTER_BATCH):
+                rows.extend(connection.execute(filtered, {"table_names": table_names[start:start + BULK_FILTER_BATCH]}))
+    # Batches are each ordered by table, so a table's rows are never split across the grouping.
+    return _group_rows(engine.dialect, rows, type_of)
+
+
+def reflect_tables(engine: Engine, table_names: List[str]) -> List[Dict[str, Any]]:
+    """Reflect ``table_names`` with the same reflector a full connect uses, so column types match."""
+    schema = reflect_schema_bulk(engine, table_names=table_names)
+    if schema is None:
+        schema = reflect_schema_parallel(engine, table_names=table_names)
+    return schema
+
+
+def iter_schema_bulk(engine: Engine, fetch_size: int = 1000) -> Optional[Iterator[Dict[str, Any]]]:
+    """Like reflect_schema_bulk, but streams the catalog rows and yields each table as it completes.
+
+    Returns None when the dialect has no bulk query.
+    """
+    entry = BULK_COLUMNS_SQL.get(engine.dialect.name)
+    if entry is None:
+        return None
+    sql, type_of = entry
+
+    def stream():
+        with engine.connect() as connection:
+            result = connection.execution_options(yield_per=fetch_size).execute(text(sql))
+            yield from _iter_grouped(engine.dialect, result, type_of)
+
+    return stream()
+
+
+def _column_details(columns) -> List[Dict[str, Any]]:
+    # columns is a list of dicts with keys: name, type, nullable, default, autoincrement, primary_key
+    return [{
+        "name": col["name"],
+        "type": str(col["type"]),
+        "nullable": col.get("nullable", True),
+        "primary_key": bool(col.get("primary_key", False))
+    } for col in columns]
+
+
+def _reflect_table(engine: Engine, table_name: str):
+    started = time.perf_counter()
+    # Each worker checks out its own pooled connection.
+    with engine.connect() as connection:
+        inspector = inspect(connection)
+        columns = inspector.get_columns(table_name)
+        # get_columns only reports primary keys on some dialects.
+        primary_key = set(inspector.get_pk_constraint(table_name).get("constrained_columns") or ())
+    for column in columns:
+        column["primary_key"] = bool(column.get("primary_key")) or column["name"] in primary_key
+    return _column_details(columns), time.perf_counter() - started
+
+
+def reflect_schema_parallel(engine: Engine, workers: int = None, table_timeout: float = None,
+                            table_names: List[str] = None) -> List[Dict[str, Any]]:
+    """Reflect columns table by table across a bounded thread pool.
+
+    Output keeps the Inspector's table order (or the order of ``table_names``
+    when given). A table that does not finish within ``table_timeout`` seconds
+    is returned without columns and flagged ``timed_out``, so savers keep what
+    they already have for it.
+    """
+    workers = workers or REFLECTION_WORKERS
+    table_timeout = table_timeout or REFLECTION_TABLE_TIMEOUT
+    started = time.perf_counter()
+    if table_names is None:
+        table_names = inspect(engine).get_table_names()
+
+    schema = []
+    serial_seconds = 0.0
+    timed_out = 0
+    executor = ThreadPoolExecutor(max_workers=max(1, min(workers, len(table_names) or 1)))
+    try:
+        futures = [executor.submit(_reflect_table, engine, name) for name in table_names]
+        for table_name, future in zip(table_names, futures):
+            try:
+                columns, elapsed = future.result(timeout=table_timeout)
+                serial_seconds += elapsed
+            except FutureTimeoutError:
+                print(f"Reflection of table {table_name} timed out after {table_timeout}s")
+                schema.append({"name": table_name, "columns": [], "timed_out": True})
+                timed_out += 1
+                continue
+            schema.append({
+                "name": table_name,
+                "columns": columns
+            })
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    wall_seconds = time.perf_counter() - started
+    if timed_out:
+        metrics.REFLECTION_TIMEOUTS.inc(timed_out, dialect=engine.dialect.name)
+    print(f"Reflected {len(table_names)} tables with {workers} workers in {wall_seconds:.3f}s "
+          f"(serial estimate {serial_seconds:.3f}s)")
+    return schema
+
+
+# Cheap change signals used by incremental refresh.
+# Each query returns one signature per table that changes whenever the table's DDL does.
+
+SQLITE_SIGNATURES_SQL = """
+SELECT name AS table_name, sql AS signature
+FROM sqlite_master
+WHERE type = 'table' AND name NOT LIKE 'sqlite_%'
+"""
+
+POSTGRESQL_SIGNATURES_SQL = """
+SELECT c.relname AS table_name,
+       c.xmin::text || ':' || COALESCE((
+           SELECT max(a.xmin::text::bigint) FROM pg_catalog.pg_attribute a
+           WHERE a.attrelid = c.oid AND a.attnum > 0
+       )::text, '') AS signature
+FROM pg_catalog.pg_class c
+JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = current_schema() AND c.relkind IN ('r', 'p')
+"""
+
+# UPDATE_TIME also moves on data writes, which only costs an extra re-reflection.
+MYSQL_SIGNATURES_SQL = """
+SELECT TABLE_NAME AS table_name,
+       CONCAT_WS('|', CREATE_TIME, UPDATE_TIME) AS signature
+FROM information_schema.TABLES
+WHERE TABLE_SCHEMA = DATABASE() AND TABLE_TYPE = 'BASE TABLE'
+"""
+
+MSSQL_SIGNATURES_SQL = """
+SELECT t.name AS table_name, CONVERT(varchar(33), t.modify_date, 126) AS signature
+FROM sys.tables t
+WHERE t.schema_id = SCHEMA_ID()
+"""
+
+TABLE_SIGNATURES_SQL = {
+    "sqlite": SQLITE_SIGNATURES_SQL,
+    "postgresql": POSTGRESQL_SIGNATURES_SQL,
+    "mysql": MYSQL_SIGNATURES_SQL,
+    "mssql": MSSQL_SIGNATURES_SQL,
+}
+
+# Database-wide DDL counters that let a refresh skip the per-table check entirely.
+CATALOG_VERSION_SQL = {
+    "sqlite": "PRAGMA schema_version",
+}
+
+
+def get_table_signatures(engine: Engine) -> Optional[Dict[str, str]]:
+    """Return a short DDL signature per table, or None if the dialect has no cheap signal."""
+    sql = TABLE_SIGNATURES_SQL.get(engine.dialect.name)
+    if sql is None:
+        return None
+    with engine.connect() as connection:
+        rows = connection.execute(text(sql)).fetchall()
+    return {
+        row.table_name: hashlib.sha1(str(row.signature).encode("utf-8")).hexdigest()
+        for row in rows
+    }
+
+
+def get_catalog_version(engine: Engine) -> Optional[str]:
+    sql = CATALOG_VERSION_SQL.get(engine.dialect.name)
+    if sql is None:
+        return None
+    with engine.connect() as connection:
+        return str(connection.execute(text(sql)).scalar())
+
+
+# Foreign keys, one row per constrained column, in one catalog query per dialect.
+
+SQLITE_FOREIGN_KEYS_SQL = """
+SELECT m.name AS table_name, 'fk_' || m.name || '_' || f.id AS constraint_name,
+       f."from" AS column_name, f."table" AS referred_table,
+       COALESCE(f."to", p.name) AS referred_column
+FROM sqlite_master AS m
+JOIN pragma_foreign_key_list(m.name) AS f
+LEFT JOIN pragma_table_info(f."table") AS p ON p.pk = f.seq + 1
+WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%'
+ORDER BY m.name, f.id, f.seq
+"""
+
+POSTGRESQL_FOREIGN_KEYS_SQL = """
+SELECT src.relname AS table_name, con.conname AS constraint_name, sa.attname AS column_name,
+       dst.relname AS referred_table, da.attname AS referred_column
+FROM pg_catalog.pg_constraint con
+JOIN pg_catalog.pg_class src ON src.oid = con.conrelid
+JOIN pg_catalog.pg_class dst ON dst.oid = con.confrelid
+JOIN pg_catalog.pg_namespace n ON n.oid = src.relnamespace
+CROSS JOIN LATERAL unnest(con.conkey, con.confkey) WITH ORDINALITY AS k(src_attnum, dst_attnum, ord)
+JOIN pg_catalog.pg_attribute sa ON sa.attrelid = con.conrelid AND sa.attnum = k.src_attnum
+JOIN pg_catalog.pg_attribute da ON da.attrelid = con.confrelid AND da.attnum = k.dst_attnum
+WHERE con.contype = 'f' AND n.nspname = current_schema()
+ORDER BY src.relname, con.conname, k.ord
+"""
+
+MYSQL_FOREIGN_KEYS_SQL = """
+SELECT TABLE_NAME AS table_name, CONSTRAINT_NAME AS constraint_name, COLUMN_NAME AS column_name,
+       REFERENCED_TABLE_NAME AS referred_table, REFERENCED_COLUMN_NAME AS referred_column
+FROM information_schema.KEY_COLUMN_USAGE
+WHERE TABLE_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME IS NOT NULL
+ORDER BY TABLE_NAME, CONSTRAINT_NAME, ORDINAL_POSITION
+"""
+
+MSSQL_FOREIGN_KEYS_SQL = """
+SELECT pt.name AS table_name, fk.name AS constraint_name, pc.name AS column_name,
+       rt.name AS referred_table, rc.name AS referred_column
+FROM sys.foreign_keys fk
+JOIN sys.foreign_key_columns fkc ON fkc.constraint_object_id = fk.object_id
+JOIN sys.tables pt ON pt.object_id = fkc.parent_object_id
+JOIN sys.columns pc ON pc.object_id = fkc.parent_object_id AND pc.column_id = fkc.parent_column_id
+JOIN sys.tables rt ON rt.object_id = fkc.referenced_object_id
+JOIN sys.columns rc ON rc.object_id = fkc.referenced_object_id AND rc.column_id = fkc.referenced_column_id
+WHERE pt.schema_id = SCHEMA_ID()
+ORDER BY pt.name, fk.name, fkc.constraint_column_id
+"""
+
+FOREIGN_KEYS_SQL = {
+    "sqlite": SQLITE_FOREIGN_KEYS_SQL,
+    "postgresql": POSTGRESQL_FOREIGN_KEYS_SQL,
+    "mysql": MYSQL_FOREIGN_KEYS_SQL,
+    "mssql": MSSQL_FOREIGN_KEYS_SQL,
+}
+
+
+def reflect_foreign_keys(engine: Engine) -> List[Dict[str, Any]]:
+    """Return every foreign-key column pair in the default schema."""
+    sql = FOREIGN_KEYS_SQL.get(engine.dialect.name)
+    if sql is not None:
+        with engine.connect() as connection:
+            rows = connection.execute(text(sql)).fetchall()
+        return [{
+            "table_name": row.table_name,
+            "constraint_name": row.constraint_name,
+            "column_name": row.column_name,
+            "referred_table": row.referred_table,
+            "referred_column": row.referred_column
+        } for row in rows]
+
+    # Unknown dialect: the Inspector's multi-table call is still a single pass.
+    foreign_keys = []
+    for (_, table_name), constraints in inspect(engine).get_multi_foreign_keys().items():
+        for i, fk in enumerate(constraints):
+            for column_name, referred_column in zip(fk["constrained_columns"], fk["referred_columns"]):
+                foreign_keys.append({
+                    "table_name": table_name,
+                    "constraint_name": fk.get("name") or f"fk_{table_name}_{i}",
+                    "column_name": column_name,
+                    "referred_table": fk["referred_table"],
+                    "referred_column": referred_column
+                })
+    return foreign_keys
+
+
+# Row-count and size estimates from catalog statistics, one query per dialect.
+# Estimates are as fresh as the database's last ANALYZE (or equivalent); no table is scanned.
+
+# dbstat walks every page, so SQLite sizes and fallback row counts are skipped above this.
+SQLITE_DBSTAT_MAX_PAGES = int(os.getenv("DATASCOUT_SQLITE_DBSTAT_MAX_PAGES", "262144"))
+
+SQLITE_STAT1_SQL = """
+SELECT tbl AS table_name, idx AS index_name, stat
+FROM sqlite_stat1
+"""
+
+# Aggregated per b-tree first: joining dbstat to sqlite_master rescans dbstat for every catalog row.
+SQLITE_DBSTAT_SQL = """
+SELECT name, SUM(CASE WHEN pagetype = 'leaf' THEN ncell ELSE 0 END) AS leaf_cells, SUM(pgsize) AS size_bytes
+FROM dbstat
+GROUP BY name
+"""
+
+POSTGRESQL_ESTIMATES_SQL = """
+SELECT c.relname AS table_name,
+       CASE WHEN c.reltuples < 0 THEN NULL ELSE c.reltuples::bigint END AS row_estimate,
+       pg_total_relation_size(c.oid) AS size_bytes
+FROM pg_catalog.pg_class c
+JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = current_schema() AND c.relkind IN ('r', 'p')
+"""
+
+MYSQL_ESTIMATES_SQL = """
+SELECT TABLE_NAME AS table_name, TABLE_ROWS AS row_estimate,
+       DATA_LENGTH + INDEX_LENGTH AS size_bytes
+FROM information_schema.TABLES
+WHERE TABLE_SCHEMA = DATABASE() AND TABLE_TYPE = 'BASE TABLE'
+"""
+
+MSSQL_ESTIMATES_SQL = """
+SELECT t.name AS table_name,
+       SUM(CASE WHEN ps.index_id IN (0, 1) THEN ps.row_count ELSE 0 END) AS row_estimate,
+       SUM(ps.reserved_page_count) * 8192 AS size_bytes
+FROM sys.tables t
+JOIN sys.dm_db_partition_stats ps ON ps.object_id = t.object_id
+WHERE t.schema_id = SCHEMA_ID()
+GROUP BY t.name
+"""
+
+TABLE_ESTIMATES_SQL = {
+    "postgresql": POSTGRESQL_ESTIMATES_SQL,
+    "mysql": MYSQL_ESTIMATES_SQL,
+    "mssql": MSSQL_ESTIMATES_SQL,
+}
+
+
+def _estimate(value) -> Optional[int]:
+    return int(value) if value is not None else None
+
+
+def _sqlite_table_estimates(connection) -> Dict[str, Dict[str, Optional[int]]]:
+    estimates = {
+        row.table_name: {"row_estimate": None, "size_bytes": None}
+        for row in connection.execute(text(SQLITE_SIGNATURES_SQL))
+    }
+    has_stat1 = connection.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")).first()
+    if has_stat1:
+        # The first number of each stat row is the row count; a partial index can see fewer rows.
+        for row in connection.execute(text(SQLITE_STAT1_SQL)):
+            rows = _estimate(str(row.stat).split(" ", 1)[0] or None)
+            current = estimates.get(row.table_name)
+            if current is not None and rows is not None and (row.index_name is None or rows > (current["row_estimate"] or 0)):
+                current["row_estimate"] = rows
+    # dbstat is only read for tables that ANALYZE has not covered, and only on files small enough to walk.
+    uncovered = {name for name, estimate in estimates.items() if estimate["row_estimate"] is None}
+    if not uncovered:
+        return estimates
+    if connection.execute(text("PRAGMA page_count")).scalar() > SQLITE_DBSTAT_MAX_PAGES:
+        return estimates
+    try:
+        btrees = connection.execute(text(SQLITE_DBSTAT_SQL)).fetchall()
+    except Exception:
+        return estimates # SQLite built without the dbstat virtual table
+    owners = dict(connection.execute(text("SELECT name, tbl_name FROM sqlite_master WHERE type IN ('table', 'index')")).fetchall())
+    for btree in btrees:
+        table_name = owners.get(btree.name)
+        current = estimates.get(table_name)
+        if current is None:
+            continue
+        current["size_bytes"] = (current["size_bytes"] or 0) + (btree.size_bytes or 0)
+        if btree.name == table_name and table_name in uncovered:
+            # Leaf cells of the table's own b-tree are its rows.
+            current["row_estimate"] = _estimate(btree.leaf_cells)
+    return estimates
+
+
+def get_table_estimates(engine: Engine) -> Optional[Dict[str, Dict[str, Optional[int]]]]:
+    """Return approximate row count and on-disk size per table, or None if the dialect has no catalog statistics."""
+    dialect = engine.dialect.name
+    if dialect == "sqlite":
+        with engine.connect() as connection:
+            return _sqlite_table_estimates(connection)
+    sql = TABLE_ESTIMATES_SQL.get(dialect)
+    if sql is None:
+        return None
+    with engine.connect() as connection:
+        rows = connection.execute(text(sql)).fetchall()
+    return {
+        row.table_name: {"row_estimate": _estimate(row.row_estimate), "size_bytes": _estimate(row.size_bytes)}
+        for row in rows
+    }
@@ -0,0 +1,134 @@
+import json
+import os
+import time
+import zlib
+from typing import Any, Dict, Iterator, Optional, Type
+
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
+
+from backend.metrics import span
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Opt-in fast response path.
+# Payloads from the internal store are shaped by the endpoint's response model as on the
+# default path, then encoded with orjson when it is installed and compressed with brotli or
+# gzip when the client accepts it. Without the flag every endpoint keeps FastAPI's default behaviour.
+FAST_RESPONSES = os.getenv("DATASCOUT_FAST_RESPONSES", "0") == "1"
+COMPRESSION_MIN_BYTES = int(os.getenv("DATASCOUT_COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("DATASCOUT_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("DATASCOUT_BROTLI_QUALITY", "5"))
+# Streamed results are flushed to the client after the first chunk, then every
+# STREAM_FLUSH_BYTES of input or STREAM_FLUSH_SECONDS, whichever comes first.
+STREAM_FLUSH_BYTES = 64 * 1024
+STREAM_FLUSH_SECONDS = float(os.getenv("DATASCOUT_STREAM_FLUSH_SECONDS", "0.05"))
+
+
+def dumps(payload: Any) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload, default=str)
+        except TypeError:
+            pass # e.g. integers wider than 64 bits
+    return json.dumps(payload, default=str, separators=(",", ":")).encode("utf-8")
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, honouring q=0."""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.lower()] = quality
+    wildcard = accepted.get("*", 0.0)
+    if brotli is not None and accepted.get("br", wildcard) > 0:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+
+def json_response(request: Request, payload: Any, status_code: int = 200) -> Response:
+    with span("serialize"):
+        body = dumps(payload)
+    headers = {"Vary": "Accept-Encoding"}
+    encoding = choose_encoding(request.headers.get("accept-encoding")) if len(body) >= COMPRESSION_MIN_BYTES else None
+    if encoding:
+        with span("compress"):
+            body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
+
+
+def schema_response(request: Request, payload: Any, model: Type[BaseModel]):
+    # Returning a Response makes FastAPI skip response_model handling, so the fast path dumps
+    # the payload through ``model`` itself and both paths return the same fields.
+    if not FAST_RESPONSES:
+        return payload
+    with span("validate"):
+        payload = model.model_validate(payload).model_dump(mode="json")
+    return json_response(request, payload)
+
+
+def compress_stream(stream: Iterator[bytes], encoding: str) -> Iterator[bytes]:
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        process, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        process = compressor.compress
+        flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+        finish = compressor.flush
+    pending = 0
+    last_flush = None
+    try:
+        for chunk in stream:
+            out = process(chunk)
+            pending += len(chunk)
+            now = time.monotonic()
+            if last_flush is None or pending >= STREAM_FLUSH_BYTES or now - last_flush >= STREAM_FLUSH_SECONDS:
+                out += flush()
+                pending = 0
+                last_flush = now
+            if out:
+                yield out
+        yield finish()
+    finally:
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+
+
+def ndjson_response(request: Request, stream: Iterator[bytes], headers: Dict[str, str]) -> StreamingResponse:
+    headers = dict(headers)
+    if FAST_RESPONSES:
+        encoding = choose_encoding(request.headers.get("accept-encoding"))
+        headers["Vary"] = "Accept-Encoding"
+        if encoding:
+            stream = compress_stream(stream, encoding)
+            headers["Content-Encoding"] = encoding
+    return StreamingResponse(stream, media_type="application/x-ndjson", headers=headers)
@@ -0,0 +1,210 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, Optional
+
+# Query result cache.
+# Entries are keyed by connection, normalized SQL, row/byte caps and a fingerprint of the
+# saved schema snapshot, and hold the exact NDJSON lines that were streamed to the client.
+RESULT_CACHE_BACKEND = os.getenv("DATASCOUT_RESULT_CACHE", "memory") # memory, sqlite or off
+RESULT_CACHE_PATH = os.getenv("DATASCOUT_RESULT_CACHE_PATH", "datascout_result_cache.db")
+RESULT_CACHE_TTL_SECONDS = float(os.getenv("DATASCOUT_RESULT_CACHE_TTL", "300"))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("DATASCOUT_RESULT_CACHE_MAX_ENTRIES", "1000"))
+RESULT_CACHE_MAX_BYTES = int(os.getenv("DATASCOUT_RESULT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+RESULT_CACHE_MAX_ENTRY_BYTES = int(os.getenv("DATASCOUT_RESULT_CACHE_MAX_ENTRY_BYTES", str(8 * 1024 * 1024)))
+
+_stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "invalidations": 0}
+_fingerprints: Dict[int, str] = {}
+_lock = threading.Lock()
+
+
+class MemoryResultStore:
+    """In-process LRU bounded by entry count and total payload bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict() # key -> (connection_id, created, lines, size)
+        self.total_bytes = 0
+
+    def get(self, key: str, ttl: float) -> Optional[List[bytes]]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry[1] > ttl:
+            self._remove(key)
+            return None
+        self.entries.move_to_end(key)
+        return entry[2]
+
+    def put(self, key: str, connection_id: int, lines: List[bytes], size: int) -> int:
+        if key in self.entries:
+            self._remove(key)
+        self.entries[key] = (connection_id, time.time(), lines, size)
+        self.total_bytes += size
+        evicted = 0
+        while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            self._remove(next(iter(self.entries)))
+            evicted += 1
+        return evicted
+
+    def invalidate(self, connection_id: int):
+        for key in [k for k, entry in self.entries.items() if entry[0] == connection_id]:
+            self._remove(key)
+
+    def clear(self):
+        self.entries.clear()
+        self.total_bytes = 0
+
+    def size(self):
+        return len(self.entries), self.total_bytes
+
+    def _remove(self, key: str):
+        entry = self.entries.pop(key)
+        self.total_bytes -= entry[3]
+
+
+class SQLiteResultStore:
+    """On-disk LRU in a local SQLite file, shared by worker processes on the same host."""
+
+    def __init__(self, path: str, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS result_cache ("
+            "key TEXT PRIMARY KEY, connection_id INTEGER, created REAL, last_used REAL, size INTEGER, payload BLOB)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS ix_result_cache_last_used ON result_cache (last_used)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS ix_result_cache_connection ON result_cache (connection_id)")
+
+    def get(self, key: str, ttl: float) -> Optional[List[bytes]]:
+        row = self.connection.execute("SELECT created, payload FROM result_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if time.time() - row[0] > ttl:
+            self.connection.execute("DELETE FROM result_cache WHERE key = ?", (key,))
+            return None
+        self.connection.execute("UPDATE result_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+        return bytes(row[1]).splitlines(keepends=True)
+
+    def put(self, key: str, connection_id: int, lines: List[bytes], size: int) -> int:
+        now = time.time()
+        self.connection.execute(
+            "INSERT OR REPLACE INTO result_cache (key, connection_id, created, last_used, size, payload) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, connection_id, now, now, size, b"".join(lines)),
+        )
+        evicted = 0
+        count, total = self.size()
+        while count > self.max_entries or total > self.max_bytes:
+            oldest = self.connection.execute(
+                "SELECT key, size FROM result_cache ORDER BY last_used LIMIT 1"
+            ).fetchone()
+            self.connection.execute("DELETE FROM result_cache WHERE key = ?", (oldest[0],))
+            count, total = count - 1, total - oldest[1]
+            evicted += 1
+        return evicted
+
+    def invalidate(self, connection_id: int):
+        self.connection.execute("DELETE FROM result_cache WHERE connection_id = ?", (connection_id,))
+
+    def clear(self):
+        self.connection.execute("DELETE FROM result_cache")
+
+    def size(self):
+        count, total = self.connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM result_cache").fetchone()
+        return count, total
+
+
+def _build_store():
+    if RESULT_CACHE_BACKEND == "off":
+        return None
+    if RESULT_CACHE_BACKEND == "sqlite":
+        return SQLiteResultStore(RESULT_CACHE_PATH, RESULT_CACHE_MAX_ENTRIES, RESULT_CACHE_MAX_BYTES)
+    return MemoryResultStore(RESULT_CACHE_MAX_ENTRIES, RESULT_CACHE_MAX_BYTES)
+
+
+_store = _build_store()
+
+
+def get_schema_fingerprint(connection_id: int, compute: Callable[[int], str]) -> str:
+    # Fingerprints are computed once per connection and dropped on invalidation.
+    with _lock:
+        fingerprint = _fingerprints.get(connection_id)
+    if fingerprint is None:
+        fingerprint = compute(connection_id)
+        with _lock:
+            _fingerprints[connection_id] = fingerprint
+    return fingerprint
+
+
+def make_key(connection_id: int, normalized_sql: str, fingerprint: str, max_rows: int, max_bytes: int) -> str:
+    raw = f"{connection_id}\x00{fingerprint}\x00{max_rows}\x00{max_bytes}\x00{normalized_sql}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def get(key: str) -> Optional[List[bytes]]:
+    if _store is None:
+        return None
+    with _lock:
+        lines = _store.get(key, RESULT_CACHE_TTL_SECONDS)
+        _stats["hits" if lines is not None else "misses"] += 1
+    return lines
+
+
+def put(key: str, connection_id: int, lines: List[bytes]):
+    if _store is None:
+        return
+    size = sum(len(line) for line in lines)
+    with _lock:
+        _stats["evictions"] += _store.put(key, connection_id, lines, size)
+        _stats["stores"] += 1
+
+
+def record(key: str, connection_id: int, stream: Iterator[bytes]) -> Iterator[bytes]:
+    """Pass ``stream`` through and store it once it completes without an error."""
+    lines = []
+    size = 0
+    for line in stream:
+        if lines is not None:
+            size += len(line)
+            if size <= RESULT_CACHE_MAX_ENTRY_BYTES:
+                lines.append(line)
+            else:
+                lines = None
+        yield line
+    if lines and not lines[-1].startswith(b'{"error"'):
+        put(key, connection_id, lines)
+
+
+def invalidate_connection(connection_id: int):
+    with _lock:
+        _fingerprints.pop(connection_id, None)
+        if _store is not None:
+            _store.invalidate(connection_id)
+        _stats["invalidations"] += 1
+
+
+def clear():
+    with _lock:
+        _fingerprints.clear()
+        if _store is not None:
+            _store.clear()
+
+
+def cache_stats() -> Dict[str, object]:
+    with _lock:
+        entries, total_bytes = _store.size() if _store is not None else (0, 0)
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats.update({
+        "backend": RESULT_CACHE_BACKEND,
+        "entries": entries,
+        "bytes": total_bytes,
+        "hit_ratio": stats["hits"] / lookups if lookups else 0.0,
+    })
+    return stats
@@ -0,0 +1,290 @@
+import math
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+# Compiled schema context for the Text-to-SQL prompt.
+# Each connection's metadata is rendered once into per-table and per-column lines and
+# kept in memory; edits patch single lines, and a token budget is applied at render time.
+CONTEXT_TOKEN_BUDGET = int(os.getenv("DATASCOUT_CONTEXT_TOKEN_BUDGET", "8000"))
+CONTEXT_CACHE_MAX_CONNECTIONS = int(os.getenv("DATASCOUT_CONTEXT_CACHE_MAX_CONNECTIONS", "64"))
+CHARS_PER_TOKEN = 4
+
+_compiled: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+# Bumped by every edit and invalidation, so a load that raced one is not cached.
+_generations: Dict[int, int] = {}
+_epoch = 0
+_lock = threading.Lock()
+
+
+def estimate_tokens(text: str) -> int:
+    # Close enough for budgeting without shipping a model tokenizer.
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def _column_score(column: Dict[str, Any]) -> int:
+    # Higher scores survive budget trimming longer.
+    score = 0
+    if column.get("primary_key"):
+        score += 3
+    if column.get("description"):
+        score += 2
+    name = column["name"].lower()
+    if column.get("references") or name == "id" or name.endswith("_id"):
+        score += 1
+    return score
+
+
+def _column_line(column: Dict[str, Any]) -> str:
+    line = f"  - {column['name']} {column['type']}"
+    if column.get("primary_key"):
+        line += " PK"
+    if not column.get("nullable", True):
+        line += " NOT NULL"
+    if column.get("references"):
+        line += " FK -> " + ", ".join(column["references"])
+    if column.get("profile"):
+        line += _profile_note(column["profile"])
+    if column.get("description"):
+        line += f" -- {column['description']}"
+    return line
+
+
+def _profile_note(profile: Dict[str, Any]) -> str:
+    # Sampled statistics hint at cardinality and value ranges for filters and joins.
+    if not profile.get("sample_rows"):
+        return ""
+    parts = []
+    if profile.get("distinct_estimate") is not None:
+        parts.append(f"~{profile['distinct_estimate']} distinct")
+    if profile.get("null_fraction"):
+        parts.append(f"{profile['null_fraction']:.0%} null")
+    if profile.get("min_value") is not None:
+        parts.append(f"{profile['min_value']}..{profile['max_value']}")
+    return f" [{', '.join(parts)}]" if parts else ""
+
+
+def _row_count(rows: int) -> str:
+    for limit, suffix in ((1e9, "B"), (1e6, "M"), (1e3, "k")):
+        if rows >= limit:
+            return f"~{rows / limit:.3g}{suffix} rows"
+    return f"~{rows} rows"
+
+
+def _table_header(name: str, context: Optional[str], row_estimate: Optional[int] = None) -> str:
+    # The catalog row estimate tells the model which tables are large before it writes joins.
+    header = f"Table {name}"
+    if row_estimate is not None:
+        header += f" ({_row_count(row_estimate)})"
+    return header + (f" -- {context}" if context else "")
+
+
+def _global_line(context: Optional[str]) -> str:
+    return f"Database context: {context}" if context else ""
+
+
+def _compile_table(table: Dict[str, Any]) -> Dict[str, Any]:
+    references = {}
+    for fk in table.get("foreign_keys", []):
+        references.setdefault(fk["column_name"], []).append(f"{fk['referred_table']}.{fk['referred_column']}")
+    columns = OrderedDict()
+    for position, column in enumerate(table["columns"]):
+        column = dict(column, references=references.get(column["name"]))
+        line = _column_line(column)
+        columns[column["name"]] = {
+            "column": column,
+            "position": position,
+            "score": _column_score(column),
+            "line": line,
+            "tokens": estimate_tokens(line) + 1
+        }
+    header = _table_header(table["name"], table.get("table_context"), table.get("row_estimate"))
+    return {"header": header, "header_tokens": estimate_tokens(header) + 1, "columns": columns,
+            "row_estimate": table.get("row_estimate")}
+
+
+def compile_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    global_line = _global_line(metadata.get("global_context"))
+    return {
+        "global": global_line,
+        "global_tokens": estimate_tokens(global_line) + 1 if global_line else 0,
+        "tables": OrderedDict((table["name"], _compile_table(table)) for table in metadata["tables"]),
+        "rendered": {}
+    }
+
+
+def _generation(connection_id: int) -> tuple:
+    return _epoch, _generations.get(connection_id, 0)
+
+
+def _bump(connection_id: int):
+    _generations[connection_id] = _generations.get(connection_id, 0) + 1
+
+
+def _get_compiled(connection_id: int, load: Callable[[int], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    with _lock:
+        compiled = _compiled.get(connection_id)
+        if compiled is not None:
+            _compiled.move_to_end(connection_id)
+            return compiled
+        generation = _generation(connection_id)
+    # Loaded outside the lock; an edit or invalidation meanwhile means this copy may be stale.
+    metadata = load(connection_id)
+    if metadata is None:
+        return None
+    compiled = compile_metadata(metadata)
+    with _lock:
+        if _generation(connection_id) != generation:
+            return compiled
+        _compiled[connection_id] = compiled
+        while len(_compiled) > CONTEXT_CACHE_MAX_CONNECTIONS:
+            _compiled.popitem(last=False)
+    return compiled
+
+
+def _render(compiled: Dict[str, Any], table_names: Optional[List[str]], budget: int) -> Dict[str, Any]:
+    # ``table_names`` is in rank order. Over budget, the lowest-scoring columns that are neither
+    # keys nor foreign keys are trimmed across all tables first, later columns before earlier ones;
+    # whole tables are dropped from the end of the ranking only when their keys alone do not fit.
+    # Every line, including the "more columns" and "more tables" markers, counts against the budget.
+    tables = compiled["tables"]
+    names = [name for name in (table_names if table_names is not None else tables.keys()) if name in tables]
+
+    def trimmable(name: str) -> List[tuple]:
+        return [(column_name, c) for column_name, c in tables[name]["columns"].items()
+                if not c["column"].get("primary_key") and not c["column"].get("references")]
+
+    def columns_marker_tokens(name: str) -> int:
+        # The widest "more columns" marker this table could need.
+        return estimate_tokens(f"  ... {len(tables[name]['columns'])} more columns") + 1
+
+    show_global = bool(compiled["global"]) and compiled["global_tokens"] <= budget
+    running = compiled["global_tokens"] if show_global else 0
+    full = {name: tables[name]["header_tokens"] + sum(c["tokens"] for c in tables[name]["columns"].values())
+            for name in names}
+    tables_marker_tokens = estimate_tokens(f"... {len(names)} more tables") + 1
+
+    kept = list(names)
+    dropped_columns: Dict[str, set] = {}
+    total = running + sum(full.values())
+    if total > budget:
+        # What each table costs with every trimmable column cut.
+        minimal = {}
+        for name in names:
+            removable = trimmable(name)
+            minimal[name] = full[name] - sum(c["tokens"] for _, c in removable)
+            if removable:
+                minimal[name] += columns_marker_tokens(name)
+        while kept and running + sum(minimal[name] for name in kept) + \
+                (tables_marker_tokens if len(kept) < len(names) else 0) > budget:
+            kept.pop()
+
+        total = running + sum(full[name] for name in kept)
+        limit = budget - (tables_marker_tokens if len(kept) < len(names) else 0)
+        rank = {name: i for i, name in enumerate(kept)}
+        candidates = sorted(
+            (c["score"], -c["position"], -rank[name], name, column_name, c["tokens"])
+            for name in kept for column_name, c in trimmable(name)
+        )
+        for _, _, _, name, column_name, tokens in candidates:
+            if total <= limit:
+                break
+            dropped = dropped_columns.setdefault(name, set())
+            if not dropped:
+                total += columns_marker_tokens(name)
+            dropped.add(column_name)
+            total -= tokens
+
+    lines = [compiled["global"]] if show_global else []
+    for name in kept:
+        table = tables[name]
+        dropped = dropped_columns.get(name, ())
+        lines.append(table["header"])
+        lines.extend(c["line"] for column_name, c in table["columns"].items() if column_name not in dropped)
+        if dropped:
+            lines.append(f"  ... {len(dropped)} more columns")
+    omitted = len(names) - len(kept)
+    if omitted and total + estimate_tokens(f"... {omitted} more tables") + 1 <= budget:
+        lines.append(f"... {omitted} more tables")
+
+    text = "\n".join(lines)
+    return {
+        "context": text,
+        "tokens": estimate_tokens(text),
+        "truncated": bool(dropped_columns) or len(kept) < len(names) or (bool(compiled["global"]) and not show_global)
+    }
+
+
+def get_schema_context(connection_id: int, load: Callable[[int], Optional[Dict[str, Any]]],
+                       token_budget: int = None, table_names: List[str] = None) -> Optional[Dict[str, Any]]:
+    """Return the prompt block for a connection, optionally limited to ``table_names``.
+
+    ``load`` fetches the connection's metadata from the internal store on a cache miss.
+    Returns None if the connection does not exist.
+    """
+    budget = token_budget or CONTEXT_TOKEN_BUDGET
+    compiled = _get_compiled(connection_id, load)
+    if compiled is None:
+        return None
+    key = (budget, tuple(table_names) if table_names is not None else None)
+    with _lock:
+        rendered = compiled["rendered"].get(key)
+        if rendered is None:
+            rendered = _render(compiled, table_names, budget)
+            if len(compiled["rendered"]) >= 16:
+                compiled["rendered"].clear()
+            compiled["rendered"][key] = rendered
+    return rendered
+
+
+def on_table_context_updated(connection_id: int, table_name: str, context: str):
+    with _lock:
+        _bump(connection_id)
+        compiled = _compiled.get(connection_id)
+        if compiled is None or table_name not in compiled["tables"]:
+            return
+        table = compiled["tables"][table_name]
+        table["header"] = _table_header(table_name, context, table["row_estimate"])
+        table["header_tokens"] = estimate_tokens(table["header"]) + 1
+        compiled["rendered"].clear()
+
+
+def on_column_description_updated(connection_id: int, table_name: str, column_name: str, description: str):
+    with _lock:
+        _bump(connection_id)
+        compiled = _compiled.get(connection_id)
+        if compiled is None or table_name not in compiled["tables"]:
+            return
+        entry = compiled["tables"][table_name]["columns"].get(column_name)
+        if entry is None:
+            return
+        entry["column"]["description"] = description
+        entry["line"] = _column_line(entry["column"])
+        entry["tokens"] = estimate_tokens(entry["line"]) + 1
+        entry["score"] = _column_score(entry["column"])
+        compiled["rendered"].clear()
+
+
+def on_global_context_updated(connection_id: int, context: str):
+    with _lock:
+        _bump(connection_id)
+        compiled = _compiled.get(connection_id)
+        if compiled is None:
+            return
+        compiled["global"] = _global_line(context)
+        compiled["global_tokens"] = estimate_tokens(compiled["global"]) + 1 if compiled["global"] else 0
+        compiled["rendered"].clear()
+
+
+def invalidate(connection_id: int):
+    with _lock:
+        _bump(connection_id)
+        _compiled.pop(connection_id, None)
+
+
+def clear():
+    global _epoch
+    with _lock:
+        _epoch += 1
+        _compiled.clear()
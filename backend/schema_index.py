@@ -0,0 +1,309 @@
+import heapq
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+# Relevance index over saved schemas.
+# Each table is one BM25 document built from its name, column names, table context and
+# column descriptions. Unknown question terms fall back to trigram fuzzy matching.
+INDEX_DIR = os.getenv("DATASCOUT_INDEX_DIR", "datascout_index")
+INDEX_CACHE_MAX_CONNECTIONS = int(os.getenv("DATASCOUT_INDEX_CACHE_MAX_CONNECTIONS", "64"))
+BM25_K1 = 1.2
+BM25_B = 0.75
+FUZZY_MIN_SIMILARITY = 0.5
+
+# Field weights, applied as repeated term frequency.
+TABLE_NAME_WEIGHT = 3
+COLUMN_NAME_WEIGHT = 2
+TEXT_WEIGHT = 1
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "i", "in", "is", "it",
+    "many", "me", "much", "of", "on", "or", "per", "show", "the", "to", "was", "what", "which",
+    "who", "with", "give", "list", "all", "each", "did", "do", "does", "have", "has",
+}
+
+_CAMEL_RE = re.compile(r"([a-z0-9])([A-Z])")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _stem(word: str) -> str:
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    words = _WORD_RE.findall(_CAMEL_RE.sub(r"\1 \2", text).lower())
+    return [_stem(word) for word in words if word not in STOPWORDS]
+
+
+def _trigrams(term: str) -> set:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def table_terms(table: Dict[str, Any]) -> Counter:
+    terms = Counter()
+    for term in tokenize(table["name"]):
+        terms[term] += TABLE_NAME_WEIGHT
+    for term in tokenize(table.get("table_context")):
+        terms[term] += TEXT_WEIGHT
+    for column in table["columns"]:
+        for term in tokenize(column["name"]):
+            terms[term] += COLUMN_NAME_WEIGHT
+        for term in tokenize(column.get("description")):
+            terms[term] += TEXT_WEIGHT
+    return terms
+
+
+class SchemaIndex:
+    """Inverted index for one connection; documents are tables.
+
+    ``fingerprint`` identifies the saved schema the index was built from, so a copy on disk
+    is only reused for that schema.
+    """
+
+    def __init__(self, doc_terms: Dict[str, Dict[str, int]], fingerprint: Optional[str] = None):
+        self.fingerprint = fingerprint
+        self.doc_terms: Dict[str, Counter] = {}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.trigrams: Dict[str, set] = {}
+        self.doc_len: Dict[str, int] = {}
+        self.total_len = 0
+        self._norms: Optional[Dict[str, float]] = None
+        for table_name, terms in doc_terms.items():
+            self._add(table_name, Counter(terms))
+
+    @classmethod
+    def from_metadata(cls, metadata: Dict[str, Any], fingerprint: Optional[str] = None) -> "SchemaIndex":
+        return cls({table["name"]: table_terms(table) for table in metadata["tables"]}, fingerprint)
+
+    def _add(self, table_name: str, terms: Counter):
+        self._norms = None
+        self.doc_terms[table_name] = terms
+        length = sum(terms.values())
+        self.doc_len[table_name] = length
+        self.total_len += length
+        for term, tf in terms.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                for gram in _trigrams(term):
+                    self.trigrams.setdefault(gram, set()).add(term)
+            postings[table_name] = tf
+
+    def _remove(self, table_name: str):
+        terms = self.doc_terms.pop(table_name, None)
+        if terms is None:
+            return
+        self._norms = None
+        self.total_len -= self.doc_len.pop(table_name)
+        for term in terms:
+            postings = self.postings[term]
+            postings.pop(table_name, None)
+            if not postings:
+                del self.postings[term]
+                for gram in _trigrams(term):
+                    bucket = self.trigrams.get(gram)
+                    if bucket is not None:
+                        bucket.discard(term)
+                        if not bucket:
+                            del self.trigrams[gram]
+
+    def update_table(self, table_name: str, terms: Counter):
+        self._remove(table_name)
+        self._add(table_name, terms)
+
+    def _fuzzy_terms(self, term: str) -> Dict[str, float]:
+        grams = _trigrams(term)
+        overlap = Counter()
+        for gram in grams:
+            for candidate in self.trigrams.get(gram, ()):
+                overlap[candidate] += 1
+        matches = {}
+        for candidate, shared in overlap.items():
+            similarity = shared / (len(grams) + len(_trigrams(candidate)) - shared)
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                matches[candidate] = similarity
+        return matches
+
+    def _length_norms(self) -> Dict[str, float]:
+        # BM25 length normalization per document, recomputed only after the index changes.
+        if self._norms is None:
+            # Documents can be empty (e.g. a table named only with stopwords); then every length counts as average.
+            avg_len = self.total_len / len(self.doc_len) if self.doc_len else 0
+            self._norms = {
+                name: BM25_K1 * (1 - BM25_B + BM25_B * (length / avg_len if avg_len else 1.0))
+                for name, length in self.doc_len.items()
+            }
+        return self._norms
+
+    def search(self, question: str, k: int = 10, fuzzy: bool = True) -> List[Dict[str, Any]]:
+        documents = len(self.doc_terms)
+        if not documents:
+            return []
+        norms = self._length_norms()
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(question)):
+            expansions = {term: 1.0} if term in self.postings else (self._fuzzy_terms(term) if fuzzy else {})
+            for matched, weight in expansions.items():
+                postings = self.postings[matched]
+                idf = math.log(1 + (documents - len(postings) + 0.5) / (len(postings) + 0.5))
+                factor = weight * idf * (BM25_K1 + 1)
+                for table_name, tf in postings.items():
+                    scores[table_name] = scores.get(table_name, 0.0) + factor * tf / (tf + norms[table_name])
+        top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [{"name": name, "score": round(score, 4)} for name, score in top]
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"fingerprint": self.fingerprint, "doc_terms": self.doc_terms}
+
+
+_indexes: "OrderedDict[int, SchemaIndex]" = OrderedDict()
+# Bumped by every update and invalidation, so an index loaded or saved across one is discarded.
+_generations: Dict[int, int] = {}
+_epoch = 0
+_lock = threading.Lock()
+
+
+def _generation(connection_id: int) -> tuple:
+    return _epoch, _generations.get(connection_id, 0)
+
+
+def _bump(connection_id: int):
+    _generations[connection_id] = _generations.get(connection_id, 0) + 1
+
+
+def _index_path(connection_id: int) -> str:
+    return os.path.join(INDEX_DIR, f"connection_{connection_id}.json")
+
+
+def _save(connection_id: int, index: SchemaIndex, generation: tuple):
+    # Written outside the lock; a file that an invalidation raced past is removed again.
+    with _lock:
+        if _generation(connection_id) != generation:
+            return
+        payload = json.dumps(index.to_json())
+    try:
+        os.makedirs(INDEX_DIR, exist_ok=True)
+        path = _index_path(connection_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        with _lock:
+            stale = _generation(connection_id) != generation
+        if stale:
+            _remove_file(connection_id)
+    except OSError as e:
+        print(f"Error persisting schema index for connection {connection_id}: {e}")
+
+
+def _load(connection_id: int, fingerprint: str) -> Optional[SchemaIndex]:
+    # A file written for another schema (e.g. an id reused after the store was reset) is ignored.
+    try:
+        with open(_index_path(connection_id)) as f:
+            data = json.load(f)
+        if data.get("fingerprint") != fingerprint:
+            return None
+        return SchemaIndex(data["doc_terms"], fingerprint)
+    except (OSError, ValueError, KeyError, AttributeError):
+        return None
+
+
+def get_index(connection_id: int, load: Callable[[int], Optional[Dict[str, Any]]],
+              fingerprint: Callable[[int], str]) -> Optional[SchemaIndex]:
+    """Return the connection's index from memory, then disk, building it from ``load`` as a last resort.
+
+    ``fingerprint(connection_id)`` identifies the saved schema; the disk copy is used only if it matches.
+    """
+    with _lock:
+        index = _indexes.get(connection_id)
+        if index is not None:
+            _indexes.move_to_end(connection_id)
+            return index
+        generation = _generation(connection_id)
+    expected = fingerprint(connection_id)
+    index = _load(connection_id, expected)
+    if index is None:
+        metadata = load(connection_id)
+        if metadata is None:
+            return None
+        index = SchemaIndex.from_metadata(metadata, expected)
+        _save(connection_id, index, generation)
+    with _lock:
+        if _generation(connection_id) != generation:
+            return index
+        _indexes[connection_id] = index
+        while len(_indexes) > INDEX_CACHE_MAX_CONNECTIONS:
+            _indexes.popitem(last=False)
+    return index
+
+
+def search(connection_id: int, question: str, load: Callable[[int], Optional[Dict[str, Any]]],
+           fingerprint: Callable[[int], str], k: int = 10, fuzzy: bool = True) -> Optional[Dict[str, Any]]:
+    index = get_index(connection_id, load, fingerprint)
+    if index is None:
+        return None
+    started = time.perf_counter()
+    with _lock:
+        tables = index.search(question, k, fuzzy)
+    return {"tables": tables, "elapsed_ms": round((time.perf_counter() - started) * 1000, 3)}
+
+
+def on_tables_updated(connection_id: int, table_names: List[str],
+                      load: Callable[..., Optional[Dict[str, Any]]]):
+    """Re-index tables whose context or column descriptions changed.
+
+    ``load(connection_id, table_names)`` returns metadata for just those tables.
+    An index that is only on disk is dropped instead, so it is rebuilt on next use.
+    """
+    with _lock:
+        _bump(connection_id)
+        index = _indexes.get(connection_id)
+        generation = _generation(connection_id)
+    if index is None:
+        _remove_file(connection_id)
+        return
+    metadata = load(connection_id, table_names)
+    if metadata is None:
+        return
+    with _lock:
+        for table in metadata["tables"]:
+            index.update_table(table["name"], table_terms(table))
+    _save(connection_id, index, generation)
+
+
+def _remove_file(connection_id: int):
+    try:
+        os.remove(_index_path(connection_id))
+    except OSError:
+        pass
+
+
+def invalidate(connection_id: int):
+    with _lock:
+        _bump(connection_id)
+        _indexes.pop(connection_id, None)
+    _remove_file(connection_id)
+
+
+def clear():
+    global _epoch
+    with _lock:
+        _epoch += 1
+        _indexes.clear()
+    if os.path.isdir(INDEX_DIR):
+        for name in os.listdir(INDEX_DIR):
+            if name.startswith("connection_") and name.endswith(".json"):
+                os.remove(os.path.join(INDEX_DIR, name))
@@ -0,0 +1,206 @@
+import re
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Tuple
+
+# Read-only SQL guard.
+# Queries are tokenized with the quoting and comment rules of their dialect, so
+# keywords inside identifiers (updated_at), string literals or comments never
+# trigger a rejection, and only a single SELECT/WITH statement is let through.
+
+GUARD_CACHE_SIZE = 4096
+
+FORBIDDEN_KEYWORDS = {
+    "INSERT", "UPDATE", "DELETE", "MERGE", "UPSERT", "INTO", "OUTFILE", "DUMPFILE",
+    "DROP", "ALTER", "CREATE", "TRUNCATE", "RENAME", "GRANT", "REVOKE", "DENY",
+    "EXEC", "EXECUTE", "CALL", "COPY", "ATTACH", "DETACH", "PRAGMA", "VACUUM",
+    "REINDEX", "LOCK", "UNLOCK", "SHUTDOWN", "WAITFOR",
+}
+
+# Functions with side effects (sleeping, file access, locks, sequences, remote execution).
+SIDE_EFFECT_FUNCTIONS = {
+    "default": set(),
+    "postgresql": {
+        "pg_sleep", "pg_sleep_for", "pg_sleep_until", "pg_terminate_backend", "pg_cancel_backend",
+        "pg_reload_conf", "pg_rotate_logfile", "pg_read_file", "pg_read_binary_file", "pg_ls_dir",
+        "pg_stat_file", "lo_import", "lo_export", "lo_unlink", "dblink", "dblink_exec", "set_config",
+        "nextval", "setval", "pg_advisory_lock", "pg_advisory_xact_lock", "pg_try_advisory_lock",
+        "pg_notify", "query_to_xml", "pg_logical_emit_message",
+    },
+    "mysql": {"sleep", "benchmark", "load_file", "get_lock", "release_lock", "release_all_locks"},
+    "mssql": {"xp_cmdshell", "openrowset", "opendatasource", "openquery", "openxml"},
+    "sqlite": {"load_extension", "writefile", "readfile", "edit"},
+}
+
+_LINE_COMMENT = r"--[^\n]*"
+_BLOCK_COMMENT = r"/\*.*?\*/"
+
+_DIALECT_PATTERNS = {
+    "default": [
+        ("comment", f"{_LINE_COMMENT}|{_BLOCK_COMMENT}"),
+        ("string", r"'(?:[^']|'')*'"),
+        ("ident", r'"(?:[^"]|"")*"'),
+    ],
+    "postgresql": [
+        ("comment", f"{_LINE_COMMENT}|{_BLOCK_COMMENT}"),
+        ("string", r"[Ee]'(?:[^'\\]|\\.|'')*'|'(?:[^']|'')*'"),
+        ("string", r"\$(?P<tag>(?:[A-Za-z_]\w*)?)\$.*?\$(?P=tag)\$"),
+        ("unterminated", r"\$(?:[A-Za-z_]\w*)?\$"),
+        ("ident", r'"(?:[^"]|"")*"'),
+    ],
+    "mysql": [
+        # /*! ... */ bodies are executed by MySQL, so they are not treated as comments.
+        ("unterminated", r"/\*[!+]"),
+        # "--" only starts a comment when followed by whitespace.
+        ("comment", r"--(?=\s|$)[^\n]*|#[^\n]*|" + _BLOCK_COMMENT),
+        ("string", r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\""),
+        ("ident", r"`(?:[^`]|``)*`"),
+    ],
+    "mssql": [
+        ("comment", f"{_LINE_COMMENT}|{_BLOCK_COMMENT}"),
+        ("string", r"[Nn]?'(?:[^']|'')*'"),
+        ("ident", r'"(?:[^"]|"")*"|\[(?:[^\]]|\]\])*\]'),
+    ],
+    "sqlite": [
+        ("comment", f"{_LINE_COMMENT}|{_BLOCK_COMMENT}"),
+        ("string", r"'(?:[^']|'')*'"),
+        ("ident", r'"(?:[^"]|"")*"|`(?:[^`]|``)*`|\[[^\]]*\]'),
+    ],
+}
+
+# Quote characters left over after the literal patterns failed to match.
+_OPENERS = {
+    "default": {"'", '"'},
+    "postgresql": {"'", '"'},
+    "mysql": {"'", '"', "`"},
+    "mssql": {"'", '"', "["},
+    "sqlite": {"'", '"', "`", "["},
+}
+
+_TAIL_PATTERNS = [
+    ("number", r"\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?"),
+    ("unterminated", r"/\*"),
+    ("word", r"[A-Za-z_@#][\w$@#]*"),
+    ("param", r"[:?$]\w*"),
+    ("punct", r"::|<>|<=|>=|!=|\|\||[^\s]"),
+]
+
+
+def _compile(dialect: str):
+    patterns = [("space", r"\s+")] + _DIALECT_PATTERNS[dialect] + _TAIL_PATTERNS
+    # Named groups cannot repeat, so tag each alternative with its position.
+    parts = [f"(?P<t{i}>{pattern})" for i, (_, pattern) in enumerate(patterns)]
+    return re.compile("|".join(parts), re.DOTALL), [kind for kind, _ in patterns]
+
+
+_SCANNERS = {dialect: _compile(dialect) for dialect in _DIALECT_PATTERNS}
+
+
+class SQLVerdict(NamedTuple):
+    allowed: bool
+    reason: Optional[str]
+    normalized: str # Comments stripped and whitespace collapsed between tokens
+
+
+def tokenize(sql: str, dialect: str = "default") -> List[Tuple[str, str]]:
+    """Split ``sql`` into (kind, text) tokens, dropping whitespace and comments."""
+    scanner, kinds = _SCANNERS.get(dialect, _SCANNERS["default"])
+    tokens = []
+    position = 0
+    while position < len(sql):
+        match = scanner.match(sql, position)
+        index = int(match.lastgroup[1:])
+        kind = kinds[index]
+        if kind not in ("space", "comment"):
+            tokens.append((kind, match.group(match.lastgroup)))
+        position = match.end()
+    return tokens
+
+
+def _normalize(tokens: List[Tuple[str, str]]) -> str:
+    # Case is kept: identifiers are case-sensitive on some dialects.
+    return " ".join(value for _, value in tokens)
+
+
+def _unquote(kind: str, value: str, dialect: str) -> Optional[str]:
+    """Return the name a word or quoted identifier refers to, or None for other tokens."""
+    if kind == "word":
+        return value
+    if kind == "ident" or (kind == "string" and dialect == "mysql" and value[0] == '"'):
+        # MySQL treats "..." as an identifier under ANSI_QUOTES.
+        closer = "]" if value[0] == "[" else value[0]
+        return value[1:-1].replace(closer * 2, closer)
+    return None
+
+
+def _verdict(tokens: List[Tuple[str, str]], dialect: str) -> Optional[str]:
+    while tokens and tokens[-1] == ("punct", ";"):
+        tokens = tokens[:-1]
+    if not tokens:
+        return "Empty query"
+
+    openers = _OPENERS[dialect]
+    for kind, value in tokens:
+        if kind == "punct" and value == ";":
+            return "Only a single statement is allowed"
+        if kind == "unterminated" or (kind == "punct" and value in openers):
+            return "Unterminated comment, literal or identifier"
+
+    first = next((value.upper() for kind, value in tokens if not (kind == "punct" and value == "(")), "")
+    if first not in ("SELECT", "WITH"):
+        return "Only SELECT or WITH queries are allowed"
+
+    # Quoted identifiers are unquoted first: "pg_sleep"(1) calls the same function as pg_sleep(1).
+    side_effects = SIDE_EFFECT_FUNCTIONS.get(dialect, set())
+    for i, (kind, value) in enumerate(tokens):
+        name = _unquote(kind, value, dialect)
+        if name is None:
+            continue
+        word = name.upper()
+        if word in FORBIDDEN_KEYWORDS:
+            return f"Keyword {word} is not allowed"
+        following = tokens[i + 1] if i + 1 < len(tokens) else None
+        if kind == "word" and word == "FOR" and following and following[1].upper() in ("SHARE", "KEY", "NO"):
+            return "Locking clauses are not allowed"
+        if following == ("punct", "(") and name.lower() in side_effects:
+            return f"Function {name} is not allowed"
+    return None
+
+
+@lru_cache(maxsize=GUARD_CACHE_SIZE)
+def _check_cached(tokens: Tuple[Tuple[str, str], ...], dialect: str) -> SQLVerdict:
+    reason = _verdict(list(tokens), dialect)
+    return SQLVerdict(reason is None, reason, _normalize(tokens))
+
+
+@lru_cache(maxsize=GUARD_CACHE_SIZE)
+def _check_text(sql: str, dialect: str) -> SQLVerdict:
+    return _check_cached(tuple(tokenize(sql, dialect)), dialect)
+
+
+def check_sql(sql: str, dialect: str = "default") -> SQLVerdict:
+    """Return the read-only verdict for ``sql``, memoized per dialect and query text.
+
+    Only a miss on the text tokenizes; the token stream then hits a second cache, so queries
+    that differ only in comments or whitespace still share one verdict.
+    """
+    if dialect not in _DIALECT_PATTERNS:
+        dialect = "default"
+    return _check_text(sql.strip(), dialect)
+
+
+def assert_read_only(sql: str, dialect: str = "default") -> SQLVerdict:
+    verdict = check_sql(sql, dialect)
+    if not verdict.allowed:
+        raise ValueError(f"Query rejected: {verdict.reason}")
+    return verdict
+
+
+def guard_cache_info():
+    """Cache statistics over both levels: a lookup misses only when the token stream is new."""
+    text, tokens = _check_text.cache_info(), _check_cached.cache_info()
+    return text._replace(hits=text.hits + tokens.hits, misses=tokens.misses)
+
+
+def clear_guard_cache():
+    _check_text.cache_clear()
+    _check_cached.cache_clear()
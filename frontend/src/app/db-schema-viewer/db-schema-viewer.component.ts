@@ -192,7 +192,7 @@ export class DbSchemaViewerComponent implements OnInit {
     async deleteConnection() {
         const confirmed = await this.modalService.confirm({
             title: 'Delete Connection',
-            message: 'Are you sure you want to delete this connection? This will reset the database and clear all saved context.',
+            message: 'Are you sure you want to delete this connection? This will clear its saved context.',
             confirmText: 'Delete',
             type: 'danger'
         });
@@ -1,6 +1,6 @@
 import { Injectable } from '@angular/core';
 import { HttpClient } from '@angular/common/http';
-import { Observable, of, delay, tap } from 'rxjs';
+import { Observable, of, delay, tap, map } from 'rxjs';
 
 export interface Column {
     name: string;
@@ -12,10 +12,51 @@ export interface Column {
 export interface Table {
     name: string;
     context?: string; // Table-level description/prompt
+    columnCount?: number;
+    rowEstimate?: number | null; // From catalog statistics, not an exact count
+    sizeBytes?: number | null;
     columns?: Column[]; // Optional, loaded on expand
     isExpanded?: boolean; // UI state
 }
 
+export interface SavedConnection {
+    connection_id: number;
+    db_type: string;
+    host?: string;
+    port?: number;
+    database?: string;
+    username?: string;
+    path?: string;
+    table_count: number;
+    created_at?: string;
+    last_used_at?: string;
+}
+
+export interface ReflectionJob {
+    job_id: string;
+    kind?: 'reflect' | 'profile';
+    db_type: string;
+    status: 'queued' | 'running' | 'completed' | 'failed' | 'cancelled';
+    tables_total: number | null;
+    tables_done: number;
+    progress: number | null;
+    connection_id: number | null;
+    error: string | null;
+    deduplicated?: boolean;
+}
+
+export interface TablePage {
+    tables: Table[];
+    nextCursor: string | null;
+}
+
+export interface MetadataChange {
+    kind: 'table_context' | 'column_description' | 'global_context';
+    table_name?: string;
+    column_name?: string;
+    value: string;
+}
+
 @Injectable({
     providedIn: 'root'
 })
@@ -40,29 +81,13 @@ export class DbSchemaService {
         this.currentDbName = dbName;
         this.currentConnectionId = connectionId;
 
-        // Transform API response to Table interface
+        // /connect/* returns only names and column counts; columns are fetched on expand
         this.currentTables = tables.map(t => ({
             name: t.name,
-            context: t.table_context || '', // Load context if available (needs backend to return it, currently backend returns schema list, we might need to fetch saved schema details or assume they are in the list if we updated the return model)
-            // Actually, the backend returns the schema from the DB engine, which doesn't have our context.
-            // We need to fetch the saved context/descriptions from our internal DB.
-            // BUT, for now, let's assume the backend "save" returns the ID, and we might need to re-fetch the "saved" schema to get the contexts?
-            // Or, the backend `save_connection_details` saves it.
-            // Wait, the requirement is "load the data in schema from the database".
-            // So when we connect, we should probably fetch the *saved* schema if it exists, or merge it.
-            // For now, let's just implement the SAVE part as requested "data from the schema page should also be saved in db".
-            // Loading part: "load the data in schema from the database".
-            // This implies when we connect, if we have saved data, we should load it.
-            // The current backend implementation of `connect_*` fetches fresh schema from the target DB and saves it to internal DB.
-            // It does NOT return the saved context/descriptions yet.
-            // I need to update the backend to return the saved info if available.
-            // But let's finish the frontend service update first to handle the saving.
-            columns: t.columns.map((c: any) => ({
-                name: c.name,
-                type: c.type,
-                description: '', // Placeholder, see above note
-                isLocked: false
-            }))
+            context: t.table_context || '',
+            columnCount: t.column_count,
+            rowEstimate: t.row_estimate,
+            sizeBytes: t.size_bytes
         }));
     }
 
@@ -78,12 +103,72 @@ export class DbSchemaService {
         return of(this.currentTables);
     }
 
+    // API: Saved connections, most recently used first
+    listSavedConnections(): Observable<SavedConnection[]> {
+        return this.http.get<SavedConnection[]>(`${this.apiUrl}/connections`);
+    }
+
+    // API: Reopen a saved connection from the internal store, without reflecting the source again
+    resumeConnection(connectionId: number): Observable<any> {
+        return this.http.post<any>(`${this.apiUrl}/connections/${connectionId}/resume`, {}).pipe(
+            tap(response => this.setSchemaData(response.tables, response.db_type, response.database, response.connection_id))
+        );
+    }
+
+    // API: Reflect a database in the background; poll getJob() until it completes
+    startConnectJob(dbType: string, details: any): Observable<ReflectionJob> {
+        return this.http.post<ReflectionJob>(`${this.apiUrl}/connect/${dbType}/async`, details);
+    }
+
+    startProfileJob(tableNames?: string[]): Observable<ReflectionJob> {
+        return this.http.post<ReflectionJob>(`${this.apiUrl}/schema/${this.currentConnectionId}/profile`, { table_names: tableNames ?? null });
+    }
+
+    getJob(jobId: string): Observable<ReflectionJob> {
+        return this.http.get<ReflectionJob>(`${this.apiUrl}/jobs/${jobId}`);
+    }
+
+    cancelJob(jobId: string): Observable<ReflectionJob> {
+        return this.http.delete<ReflectionJob>(`${this.apiUrl}/jobs/${jobId}`);
+    }
+
+    // API: One page of saved tables, optionally filtered by name prefix
+    getTablePage(cursor: string | null = null, prefix: string = '', limit: number = 50): Observable<TablePage> {
+        if (!this.currentConnectionId) return of({ tables: [], nextCursor: null });
+        const params: { [key: string]: string } = { limit: String(limit) };
+        if (cursor) params['cursor'] = cursor;
+        if (prefix) params['prefix'] = prefix;
+        return this.http.get<any>(`${this.apiUrl}/schema/${this.currentConnectionId}/tables`, { params }).pipe(
+            map(page => ({
+                tables: page.tables.map((t: any) => ({
+                    name: t.name,
+                    context: t.table_context || '',
+                    columnCount: t.column_count,
+                    rowEstimate: t.row_estimate,
+                    sizeBytes: t.size_bytes
+                })),
+                nextCursor: page.next_cursor
+            }))
+        );
+    }
+
     getColumns(tableName: string): Observable<Column[]> {
         const table = this.currentTables.find(t => t.name === tableName);
         if (table && table.columns) {
             return of(table.columns);
         }
-        return of([]);
+        if (!this.currentConnectionId) return of([]);
+        return this.http.get<any>(`${this.apiUrl}/schema/${this.currentConnectionId}/tables/${encodeURIComponent(tableName)}`).pipe(
+            map(t => t.columns.map((c: any) => ({
+                name: c.name,
+                type: c.type,
+                description: c.description || '',
+                isLocked: false
+            }))),
+            tap(columns => {
+                if (table) table.columns = columns;
+            })
+        );
     }
 
     // API: Save column description
@@ -104,15 +189,22 @@ export class DbSchemaService {
         return this.http.put(`${this.apiUrl}/schema/${this.currentConnectionId}/global/context`, { context });
     }
 
+    // API: Save many table contexts / column descriptions / global context in one transaction
+    saveMetadataBatch(changes: MetadataChange[]): Observable<any> {
+        if (!this.currentConnectionId) return of(null);
+        return this.http.put(`${this.apiUrl}/schema/${this.currentConnectionId}/batch`, { changes });
+    }
+
     // API: Toggle lock state
     toggleLock(tableName: string, columnName: string, isLocked: boolean): Observable<boolean> {
         console.log(`Toggling lock for ${tableName}.${columnName} to ${isLocked}`);
         return of(true);
     }
 
-    // API: Delete connection (reset DB)
+    // API: Delete the current connection and its saved context
     deleteConnection(): Observable<any> {
-        return this.http.delete(`${this.apiUrl}/connection`).pipe(
+        if (!this.currentConnectionId) return of(null);
+        return this.http.delete(`${this.apiUrl}/connection/${this.currentConnectionId}`).pipe(
             tap(() => {
                 this.currentTables = [];
                 this.currentDbType = '';
@@ -0,0 +1,182 @@
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sqlalchemy
+from fastapi.testclient import TestClient
+
+import backend.database as database
+from backend.engines import dispose_all, get_engine
+
+# Reflection, persistence and metadata endpoint benchmarks.
+# Synthetic SQLite databases are generated once per size and reused; a local SQLite
+# file stands in for the internal metadata DB. Results go to a JSON file that can be
+# compared with an earlier run via --compare.
+SIZES = [10, 1000, 10000]
+MIN_COLUMNS = 2
+MAX_COLUMNS = 40
+COLUMN_TYPES = ["INTEGER", "TEXT", "REAL", "VARCHAR(255)", "NUMERIC(12, 2)", "TIMESTAMP", "BOOLEAN"]
+DESCRIPTION_UPDATES = 200
+SEED = 42
+
+def generate_source_db(path, tables):
+    # Deterministic widths and types, so runs on different commits see the same schema.
+    if os.path.exists(path):
+        return
+    rng = random.Random(SEED + tables)
+    statements = []
+    for t in range(tables):
+        width = rng.randint(MIN_COLUMNS, MAX_COLUMNS)
+        columns = ["id INTEGER PRIMARY KEY"]
+        for c in range(1, width):
+            columns.append(f"col_{c:02d} {rng.choice(COLUMN_TYPES)}{' NOT NULL' if rng.random() < 0.2 else ''}")
+        if t and rng.random() < 0.3:
+            columns.append(f"ref_id INTEGER REFERENCES table_{rng.randrange(t):05d}(id)")
+        statements.append(f"CREATE TABLE table_{t:05d} ({', '.join(columns)})")
+    tmp_path = f"{path}.tmp"
+    connection = sqlite3.connect(tmp_path)
+    connection.executescript(";\n".join(statements) + ";")
+    connection.close()
+    os.replace(tmp_path, path)
+
+def reset_internal_db(workdir):
+    path = os.path.join(workdir, "internal.db")
+    dispose_all()
+    database.dispose_internal_db_engine()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    database.INTERNAL_DB_URL = f"sqlite:///{path}"
+    database.init_db()
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+def measure(fn, runs):
+    """Time ``fn`` ``runs`` times, then run it once more under tracemalloc for peak memory."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "runs": runs,
+        "p50_ms": round(percentile(timings, 0.5), 3),
+        "p95_ms": round(percentile(timings, 0.95), 3),
+        "min_ms": round(min(timings), 3),
+        "peak_kib": round(peak / 1024, 1)
+    }
+
+def benchmark_size(workdir, tables, runs):
+    source_path = os.path.join(workdir, f"source_{tables}.db")
+    generate_source_db(source_path, tables)
+    reset_internal_db(workdir)
+    engine = get_engine(database.build_connection_url("sqlite", {"path": source_path}))
+    schema = database.get_schema_from_engine(engine)
+    results = {"columns": sum(len(table["columns"]) for table in schema)}
+
+    results["get_schema_from_engine"] = measure(lambda: database.get_schema_from_engine(engine), runs)
+    results["save_connection_details"] = measure(
+        lambda: database.save_connection_details("sqlite", {"path": source_path}, schema), runs
+    )
+
+    connection_id = database.save_connection_details("sqlite", {"path": source_path}, schema)
+    rng = random.Random(SEED)
+    targets = [(table["name"], rng.choice(table["columns"])["name"]) for table in rng.choices(schema, k=DESCRIPTION_UPDATES)]
+    updates = iter(range(10 ** 9))
+
+    def update_description():
+        table_name, column_name = targets[next(updates) % len(targets)]
+        database.update_column_description(connection_id, table_name, column_name, f"benchmark {table_name}.{column_name}")
+
+    results["update_column_description"] = measure(update_description, DESCRIPTION_UPDATES)
+
+    from backend.main import app
+    client = TestClient(app)
+
+    def connect():
+        response = client.post("/connect/sqlite", json={"path": source_path})
+        response.raise_for_status()
+
+    results["connect_sqlite"] = measure(connect, runs)
+    return results
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(current, previous):
+    print(f"\nCompared with {previous.get('commit')} ({previous.get('timestamp')}):")
+    for size, benchmarks in current["results"].items():
+        for name, stats in benchmarks.items():
+            before = previous.get("results", {}).get(size, {}).get(name)
+            if not isinstance(stats, dict) or not before:
+                continue
+            ratio = before["p50_ms"] / stats["p50_ms"] if stats["p50_ms"] else float("inf")
+            print(f"  {size:>6} tables  {name:<26} p50 {before['p50_ms']:10.2f} -> {stats['p50_ms']:10.2f} ms  ({ratio:.2f}x)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark schema reflection, persistence and metadata endpoints.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="table counts to generate")
+    parser.add_argument("--runs", type=int, default=5, help="timed runs per benchmark")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "datascout_benchmark"),
+                        help="where synthetic databases are generated and cached")
+    parser.add_argument("--output", help="results JSON path (default: benchmark_results/<timestamp>-<commit>.json)")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    commit = git_commit()
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    report = {
+        "commit": commit,
+        "timestamp": timestamp,
+        "python": platform.python_version(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "platform": platform.platform(),
+        "runs": args.runs,
+        "results": {}
+    }
+    for tables in args.sizes:
+        print(f"Benchmarking {tables} tables...")
+        report["results"][str(tables)] = results = benchmark_size(args.workdir, tables, args.runs)
+        for name, stats in results.items():
+            if isinstance(stats, dict):
+                print(f"  {name:<26} p50 {stats['p50_ms']:10.2f} ms  p95 {stats['p95_ms']:10.2f} ms  peak {stats['peak_kib']:10.0f} KiB")
+    report["max_rss_kib"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    output = args.output or os.path.join("benchmark_results", f"{timestamp}-{commit or 'unknown'}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+if __name__ == "__main__":
+    main()
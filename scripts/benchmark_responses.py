@@ -0,0 +1,74 @@
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from backend import responses
+from backend.models import DatabaseSchemaResponse
+
+# Default response_model path vs the fast path, on synthetic schemas shaped like
+# DatabaseSchemaResponse. Timings are end to end through the ASGI app, including
+# client-side decompression for the compressed variants.
+TABLE_COUNTS = [1000, 10000]
+COLUMNS_PER_TABLE = 20
+RUNS = 5
+
+def make_schema(tables):
+    return {
+        "connection_id": 1,
+        "tables": [
+            {
+                "name": f"table_{t:05d}",
+                "columns": [
+                    {"name": f"column_{c:02d}", "type": "VARCHAR(255)" if c % 3 else "INTEGER",
+                     "nullable": c != 0, "primary_key": c == 0}
+                    for c in range(COLUMNS_PER_TABLE)
+                ]
+            }
+            for t in range(tables)
+        ]
+    }
+
+def build_app(payload):
+    app = FastAPI()
+
+    @app.get("/default", response_model=DatabaseSchemaResponse)
+    def default_path():
+        return payload
+
+    @app.get("/fast")
+    def fast_path(request: Request):
+        return responses.json_response(request, payload)
+
+    return app
+
+def bench(client, path, accept_encoding):
+    timings = []
+    size = 0
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        response = client.get(path, headers={"Accept-Encoding": accept_encoding})
+        timings.append(time.perf_counter() - start)
+        size = response.num_bytes_downloaded
+    return statistics.median(timings) * 1000, size
+
+def benchmark_responses():
+    print(f"orjson: {'yes' if responses.orjson else 'no'}, brotli: {'yes' if responses.brotli else 'no'}")
+    variants = [("default", "/default", "identity"), ("fast", "/fast", "identity"), ("fast+gzip", "/fast", "gzip")]
+    if responses.brotli is not None:
+        variants.append(("fast+br", "/fast", "br"))
+    for tables in TABLE_COUNTS:
+        client = TestClient(build_app(make_schema(tables)))
+        baseline = None
+        for label, path, encoding in variants:
+            ms, size = bench(client, path, encoding)
+            baseline = baseline or ms
+            print(f"{tables:>6} tables  {label:<10} {ms:9.1f} ms  {size / 1024:9.0f} KiB  {baseline / ms:5.1f}x")
+
+if __name__ == "__main__":
+    benchmark_responses()
@@ -0,0 +1,84 @@
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.compact_schema import CompactSchema
+
+# Memory of a cached schema as load_connection_metadata dicts vs CompactSchema.
+# Strings are built fresh per row, as a database driver returns them, so the dict
+# layout does not benefit from accidental sharing.
+TABLES = 2500
+COLUMNS_PER_TABLE = 20 # 50k columns
+DESCRIBED_FRACTION = 0.05
+COLUMN_NAMES = ["id", "name", "created_at", "updated_at", "status", "amount", "customer_id", "email",
+                "description", "code", "quantity", "price", "region", "owner_id", "is_active"]
+COLUMN_TYPES = ["INTEGER", "VARCHAR(255)", "TEXT", "TIMESTAMP", "NUMERIC(12, 2)", "BOOLEAN", "DATE"]
+
+def fresh(value):
+    return "".join(list(value))
+
+def make_metadata():
+    rng = random.Random(7)
+    tables = []
+    for t in range(TABLES):
+        columns = []
+        for c in range(COLUMNS_PER_TABLE):
+            name = COLUMN_NAMES[c] if c < len(COLUMN_NAMES) else f"attribute_{c}"
+            column = {
+                "name": fresh(name),
+                "type": fresh(rng.choice(COLUMN_TYPES)),
+                "nullable": c != 0,
+                "primary_key": c == 0
+            }
+            if rng.random() < DESCRIBED_FRACTION:
+                column["description"] = fresh(f"Business meaning of {name} in table {t}")
+            columns.append(column)
+        tables.append({"name": fresh(f"table_{t:05d}"), "table_context": None, "columns": columns, "foreign_keys": [],
+                       "row_estimate": rng.randrange(10 ** 6), "size_bytes": rng.randrange(10 ** 9)})
+    return {"connection_id": 1, "db_type": "postgresql", "database": "bench", "global_context": None, "tables": tables}
+
+def traced_bytes(build):
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, current
+
+def benchmark_schema_memory():
+    metadata, dict_bytes = traced_bytes(make_metadata)
+    columns = sum(len(table["columns"]) for table in metadata["tables"])
+
+    # Build from a separate copy so the compact side owns every string it keeps.
+    def build_compact():
+        source = make_metadata()
+        compact = CompactSchema(source)
+        del source
+        return compact
+
+    compact, compact_bytes = traced_bytes(build_compact)
+
+    start = time.perf_counter()
+    restored = compact.to_metadata()
+    to_metadata_ms = (time.perf_counter() - start) * 1000
+    assert restored["tables"] == metadata["tables"], "round trip changed the metadata"
+
+    start = time.perf_counter()
+    compact.tables["table_01234"].to_dict()
+    table_us = (time.perf_counter() - start) * 1e6
+
+    print(f"columns                 {columns}")
+    print(f"dict metadata           {dict_bytes / 1024 / 1024:8.2f} MiB  ({dict_bytes / columns:6.1f} B/column)")
+    print(f"compact schema          {compact_bytes / 1024 / 1024:8.2f} MiB  ({compact_bytes / columns:6.1f} B/column)")
+    print(f"reduction               {dict_bytes / compact_bytes:8.1f}x")
+    print(f"full to_metadata        {to_metadata_ms:8.1f} ms")
+    print(f"one table to_dict       {table_us:8.1f} us")
+
+if __name__ == "__main__":
+    benchmark_schema_memory()
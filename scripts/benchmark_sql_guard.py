@@ -0,0 +1,35 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.sql_guard import check_sql, clear_guard_cache, guard_cache_info
+
+# Representative agent queries, from a one-liner to a multi-CTE report
+QUERIES = [
+    "SELECT id, name, updated_at FROM customers WHERE id = 42",
+    "SELECT c.name, SUM(o.total) AS revenue FROM customers c JOIN orders o ON o.customer_id = c.id "
+    "GROUP BY c.name ORDER BY revenue DESC LIMIT 10",
+    "WITH monthly AS (SELECT date_trunc('month', created_at) AS m, COUNT(*) AS n FROM activity_logs GROUP BY 1), "
+    "ranked AS (SELECT m, n, RANK() OVER (ORDER BY n DESC) AS r FROM monthly) "
+    "SELECT * FROM ranked WHERE r <= 3 -- top months\n",
+    "SELECT e.name, p.amount FROM employees e JOIN payroll p ON p.employee_id = e.id WHERE p.note = 'it''s ; DROP'",
+]
+ITERATIONS = 20000
+
+def bench(label, fn):
+    start = time.perf_counter()
+    for i in range(ITERATIONS):
+        fn(QUERIES[i % len(QUERIES)])
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} {elapsed / ITERATIONS * 1e6:8.2f} us/query")
+
+def benchmark_sql_guard():
+    bench("cold", lambda sql: (clear_guard_cache(), check_sql(sql, "postgresql")))
+    clear_guard_cache()
+    bench("cached", lambda sql: check_sql(sql, "postgresql"))
+    print(guard_cache_info())
+
+if __name__ == "__main__":
+    benchmark_sql_guard()
@@ -1,35 +1,16 @@
-import psycopg2
-from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+import os
+import sys
 
-# Credentials from AllTestCredentials.md for PostgreSQL
-HOST = "localhost"
-PORT = 5433
-USER = "postgres"
-PASSWORD = "postgres"
-DB_NAME = "DataScout"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from backend.database import INTERNAL_DB_URL, drop_internal_tables
+
+# Drops DataScout's internal tables from the store configured by DATASCOUT_INTERNAL_DB_URL
+# (the local Postgres by default, or an embedded SQLite file).
 def drop_tables():
-    try:
-        con = psycopg2.connect(
-            host=HOST,
-            port=PORT,
-            user=USER,
-            password=PASSWORD,
-            dbname=DB_NAME
-        )
-        con.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
-        cur = con.cursor()
-        
-        print("Dropping tables...")
-        cur.execute("DROP TABLE IF EXISTS saved_schemas CASCADE")
-        cur.execute("DROP TABLE IF EXISTS saved_connections CASCADE")
+    print(f"Dropping tables from {INTERNAL_DB_URL.split('@')[-1]}...")
+    if drop_internal_tables():
         print("Tables dropped.")
-            
-        cur.close()
-        con.close()
-        
-    except Exception as e:
-        print(f"Error dropping tables: {e}")
 
 if __name__ == "__main__":
     drop_tables()
@@ -34,18 +34,18 @@ def connect_mysql():
         if response.status_code == 200:
             data = response.json()
             print(f"Successfully connected. Connection ID: {data.get('connection_id')}")
-            return True
+            return data.get('connection_id')
         else:
             print(f"Failed to connect to MySQL. Status: {response.status_code}, Detail: {response.text}")
-            return False
+            return None
     except Exception as e:
         print(f"Exception during connection: {e}")
-        return False
+        return None
 
-def delete_connection():
-    print("Attempting to delete connection...")
+def delete_connection(connection_id):
+    print(f"Attempting to delete connection {connection_id}...")
     try:
-        response = requests.delete(f"{BASE_URL}/connection")
+        response = requests.delete(f"{BASE_URL}/connection/{connection_id}")
         if response.status_code == 200:
             print("Delete request successful.")
             return True
@@ -60,13 +60,14 @@ if __name__ == "__main__":
     if not wait_for_backend():
         sys.exit(1)
     
-    if not connect_mysql():
+    connection_id = connect_mysql()
+    if connection_id is None:
         sys.exit(1)
     
     # Wait a bit to ensure everything is settled
     time.sleep(2)
     
-    if delete_connection():
+    if delete_connection(connection_id):
         print("TEST PASSED: Connection deleted successfully.")
     else:
         print("TEST FAILED: Could not delete connection.")
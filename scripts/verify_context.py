@@ -1,5 +1,4 @@
 import psycopg2
-import json
 
 # Credentials from AllTestCredentials.md for PostgreSQL
 HOST = "localhost"
@@ -29,17 +28,10 @@ def verify_context():
         table_ctx = cur.fetchone()
         print(f"Table Context: {table_ctx[0] if table_ctx else 'None'}")
         
-        # Check Column Description (in JSON)
-        cur.execute("SELECT columns_json FROM saved_schemas WHERE table_name='products' ORDER BY id DESC LIMIT 1")
-        columns_json = cur.fetchone()
-        if columns_json:
-            cols = columns_json[0] # It's already a dict/list if using psycopg2 with json support, or string
-            if isinstance(cols, str):
-                cols = json.loads(cols)
-            
-            for col in cols:
-                if col['name'] == 'id':
-                    print(f"Column 'id' Description: {col.get('description', 'None')}")
+        # Check Column Description
+        cur.execute("SELECT description FROM saved_column_descriptions WHERE table_name='products' AND column_name='id' ORDER BY id DESC LIMIT 1")
+        description = cur.fetchone()
+        print(f"Column 'id' Description: {description[0] if description and description[0] else 'None'}")
         
         cur.close()
         con.close()
@@ -0,0 +1,60 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend import compact_schema, database, join_graph, result_cache, schema_context, schema_index
+from backend.engines import dispose_all
+
+SOURCE_DDL = """
+CREATE TABLE customers (id INTEGER PRIMARY KEY, name TEXT NOT NULL, updated_at TEXT);
+CREATE TABLE orders (id INTEGER PRIMARY KEY, customer_id INTEGER REFERENCES customers(id), total REAL);
+CREATE TABLE items (id INTEGER PRIMARY KEY, order_id INTEGER REFERENCES orders(id), sku TEXT);
+CREATE TABLE lone (id INTEGER);
+"""
+
+
+@pytest.fixture
+def internal_store(tmp_path, monkeypatch):
+    # Each test gets its own embedded SQLite store and index directory instead of the local Postgres.
+    monkeypatch.setattr(database, "INTERNAL_DB_URL", f"sqlite:///{tmp_path / 'internal.db'}")
+    monkeypatch.setattr(schema_index, "INDEX_DIR", str(tmp_path / "index"))
+    database.dispose_internal_db_engine()
+    database.init_db()
+    yield database.get_internal_db_engine()
+    for cache in (result_cache, compact_schema, schema_context, schema_index, join_graph):
+        cache.clear()
+    database.dispose_internal_db_engine()
+    dispose_all()
+
+
+@pytest.fixture
+def source_db(tmp_path):
+    path = str(tmp_path / "source.db")
+    connection = sqlite3.connect(path)
+    connection.executescript(SOURCE_DDL)
+    connection.executemany("INSERT INTO customers (name, updated_at) VALUES (?, ?)",
+                           [(f"customer {i}", f"2024-01-{i % 28 + 1:02d}") for i in range(50)])
+    connection.executemany("INSERT INTO orders (customer_id, total) VALUES (?, ?)",
+                           [(i % 50 + 1, i * 1.5) for i in range(200)])
+    connection.commit()
+    connection.close()
+    return path
+
+
+@pytest.fixture
+def client(internal_store):
+    # No lifespan events: shutdown would stop the shared job executor for later tests.
+    from fastapi.testclient import TestClient
+    from backend.main import app
+    return TestClient(app)
+
+
+@pytest.fixture
+def connection_id(client, source_db):
+    response = client.post("/connect/sqlite", json={"path": source_db})
+    assert response.status_code == 200
+    return response.json()["connection_id"]
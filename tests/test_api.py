@@ -0,0 +1,205 @@
+import json
+import sqlite3
+import time
+import zlib
+
+import pytest
+
+from backend import database, execution, jobs, responses
+
+
+def test_metadata_batch_applies_in_order_and_reports_missing_targets(client, connection_id):
+    changes = [
+        {"kind": "table_context", "table_name": "orders", "value": "one row per order"},
+        {"kind": "column_description", "table_name": "orders", "column_name": "total", "value": "draft"},
+        {"kind": "column_description", "table_name": "orders", "column_name": "total", "value": "order total"},
+        {"kind": "column_description", "table_name": "orders", "column_name": "missing", "value": "x"},
+        {"kind": "global_context", "value": "shop database"},
+    ]
+    response = client.put(f"/schema/{connection_id}/batch", json={"changes": changes})
+    assert [result["status"] for result in response.json()["results"]] == ["updated"] * 3 + ["not_found", "updated"]
+
+    table = client.get(f"/schema/{connection_id}/tables/orders").json()
+    assert table["table_context"] == "one row per order"
+    assert next(c for c in table["columns"] if c["name"] == "total")["description"] == "order total"
+    assert database.load_connection_metadata(connection_id)["global_context"] == "shop database"
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_queries_stream_ndjson_with_a_trailer(client, connection_id):
+    response = client.post(f"/query/{connection_id}", json={"sql": "SELECT id, total FROM orders ORDER BY id", "max_rows": 5})
+    lines = ndjson(response)
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert lines[0] == {"columns": ["id", "total"]}
+    assert lines[1:-1] == [[i + 1, i * 1.5] for i in range(5)]
+    assert lines[-1] == {"done": True, "row_count": 5, "truncated": "max_rows"}
+
+
+def test_writes_are_rejected_before_reaching_the_source(client, connection_id, source_db):
+    response = client.post(f"/query/{connection_id}", json={"sql": "DELETE FROM orders"})
+    assert response.status_code == 400
+    connection = sqlite3.connect(source_db)
+    assert connection.execute("SELECT count(*) FROM orders").fetchone()[0] == 200
+    connection.close()
+
+
+def test_queries_run_read_only_even_past_the_guard(client, connection_id, monkeypatch):
+    engine = database.get_saved_connection_engine(connection_id)
+    monkeypatch.setattr(execution, "assert_read_only", lambda sql, dialect: None)
+    with pytest.raises(Exception, match="readonly|read-only|read only"):
+        execution.open_query_stream(engine, "DELETE FROM orders")
+    # The pooled connection is writable again once the query is done.
+    with engine.begin() as connection:
+        connection.exec_driver_sql("INSERT INTO lone (id) VALUES (1)")
+
+
+def test_repeated_queries_are_served_from_the_result_cache(client, connection_id):
+    body = {"sql": "SELECT id, total FROM orders ORDER BY id", "max_rows": 5}
+    first = client.post(f"/query/{connection_id}", json=body)
+    assert first.headers["x-cache"] == "MISS"
+
+    # Whitespace and comments normalize to the same cache key.
+    second = client.post(f"/query/{connection_id}", json={**body, "sql": "SELECT id,  total FROM orders -- again\nORDER BY id"})
+    assert second.headers["x-cache"] == "HIT"
+    assert ndjson(second) == ndjson(first)
+
+
+def test_prompt_context_stays_within_the_token_budget(client, connection_id):
+    full = client.get(f"/schema/{connection_id}/prompt").json()
+    assert not full["truncated"] and "Table orders" in full["context"]
+    small = client.get(f"/schema/{connection_id}/prompt", params={"token_budget": 30}).json()
+    assert small["truncated"] and small["tokens"] <= 30
+
+
+def test_relevance_search_and_prompt_use_the_question(client, connection_id):
+    client.put(f"/schema/{connection_id}/column/items/sku/description", json={"description": "stock keeping unit"})
+    relevant = client.get(f"/schema/{connection_id}/relevant", params={"question": "which stock units were ordered", "k": 2}).json()
+    assert relevant["tables"][0]["name"] == "items"
+
+    prompt = client.get(f"/schema/{connection_id}/prompt", params={"question": "customer names", "k": 1}).json()
+    assert prompt["context"].startswith("Table customers")
+    assert "Table orders" not in prompt["context"]
+
+
+def test_join_paths_follow_foreign_keys(client, connection_id):
+    path = client.get(f"/schema/{connection_id}/join-path", params={"source": "customers", "target": "items"}).json()
+    assert path["connected"] and path["hops"] == 2
+    unconnected = client.get(f"/schema/{connection_id}/join-path", params={"source": "customers", "target": "lone"}).json()
+    assert not unconnected["connected"]
+    assert client.get(f"/schema/{connection_id}/join-path", params={"source": "customers", "target": "nope"}).status_code == 404
+
+
+def test_table_pages_follow_the_cursor_without_gaps_or_repeats(client, source_db):
+    connection = sqlite3.connect(source_db)
+    connection.executescript("".join(f"CREATE TABLE t{i:03d} (id INTEGER PRIMARY KEY);" for i in range(25)))
+    connection.close()
+    connection_id = client.post("/connect/sqlite", json={"path": source_db}).json()["connection_id"]
+
+    names, cursor = [], None
+    while True:
+        params = {"limit": 7, **({"cursor": cursor} if cursor else {})}
+        page = client.get(f"/schema/{connection_id}/tables", params=params).json()
+        assert len(page["tables"]) <= 7
+        names.extend(table["name"] for table in page["tables"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert names == sorted(names)
+    assert len(names) == len(set(names)) == 29
+
+    prefixed = client.get(f"/schema/{connection_id}/tables", params={"prefix": "t00"}).json()
+    assert [table["name"] for table in prefixed["tables"]] == [f"t00{i}" for i in range(10)]
+    assert client.get(f"/schema/{connection_id}/tables", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_streamed_results_are_compressed_when_accepted(client, connection_id, monkeypatch):
+    monkeypatch.setattr(responses, "FAST_RESPONSES", True)
+    response = client.post(f"/query/{connection_id}", json={"sql": "SELECT * FROM customers"},
+                           headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert ndjson(response)[-1]["row_count"] == 50
+
+
+def test_compressed_streams_flush_the_first_chunk():
+    stream = responses.compress_stream(iter([b'{"columns":["id"]}\n', b"[1]\n"]), "gzip")
+    decompressor = zlib.decompressobj(31)
+    assert decompressor.decompress(next(stream)) == b'{"columns":["id"]}\n'
+
+
+def test_metrics_report_request_timings(client, connection_id):
+    response = client.get(f"/schema/{connection_id}/tables")
+    assert "server-timing" in response.headers
+    metrics = client.get("/metrics").text
+    assert "datascout_result_cache_hit_ratio" in metrics
+
+
+def test_saved_connections_are_listed_and_resumed(client, connection_id):
+    listed = client.get("/connections").json()
+    assert [connection["connection_id"] for connection in listed] == [connection_id]
+    resumed = client.post(f"/connections/{connection_id}/resume").json()
+    assert sorted(table["name"] for table in resumed["tables"]) == ["customers", "items", "lone", "orders"]
+
+
+def wait_for(job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = jobs.get_job(job_id)
+        if job["status"] in jobs.TERMINAL_STATUSES:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_async_connect_reports_progress_and_the_connection(client, source_db):
+    job = client.post("/connect/sqlite/async", json={"path": source_db}).json()
+    finished = wait_for(job["job_id"])
+    assert finished["status"] == "completed" and finished["tables_done"] == 4
+    assert client.get(f"/schema/{finished['connection_id']}/tables/orders").status_code == 200
+
+
+def test_deleted_connections_are_gone_from_every_endpoint(client, connection_id):
+    assert client.delete("/connection").status_code == 404 # the wipe-everything endpoint is gone
+    assert client.delete(f"/connection/{connection_id}").status_code == 200
+    assert client.get("/connections").json() == []
+    assert client.post(f"/connections/{connection_id}/resume").status_code == 404
+    assert client.get(f"/schema/{connection_id}/tables/orders").status_code == 404
+
+
+def test_profiling_jobs_attach_profiles_to_columns(client, connection_id):
+    profile = client.post(f"/schema/{connection_id}/profile", json={"table_names": ["orders"]}).json()
+    assert wait_for(profile["job_id"])["status"] == "completed"
+    columns = {c["name"]: c for c in client.get(f"/schema/{connection_id}/tables/orders").json()["columns"]}
+    assert columns["total"]["profile"]["sample_rows"] == 200
+    assert columns["customer_id"]["profile"]["distinct_estimate"] == 50
+
+
+@pytest.mark.parametrize("path", ["/schema/{id}/tables/orders", "/schema/{id}/tables", "/connections/{id}/resume"])
+def test_fast_responses_return_the_same_fields_as_the_default_path(client, connection_id, monkeypatch, path):
+    path = path.format(id=connection_id)
+    request = client.post if path.endswith("/resume") else client.get
+    default = request(path).json()
+    monkeypatch.setattr(responses, "FAST_RESPONSES", True)
+    assert request(path).json() == default
+    if path.endswith("/orders"):
+        assert [fk["referred_table"] for fk in default["foreign_keys"]] == ["customers"]
+
+
+def test_reconnects_share_the_saved_connection_and_its_deletion(client, source_db):
+    first = client.post("/connect/sqlite", json={"path": source_db}).json()
+    second = client.post("/connect/sqlite", json={"path": source_db}).json()
+    assert not first["reused"]
+    assert second["reused"] and second["connection_id"] == first["connection_id"]
+
+    connection_id = first["connection_id"]
+    client.put(f"/schema/{connection_id}/column/orders/total/description", json={"description": "order total"})
+    table = client.get(f"/schema/{second['connection_id']}/tables/orders").json()
+    assert next(c for c in table["columns"] if c["name"] == "total")["description"] == "order total"
+
+    # Deleting through one session removes the snapshot the other one was using.
+    assert client.delete(f"/connection/{connection_id}").status_code == 200
+    assert client.get(f"/schema/{second['connection_id']}/tables/orders").status_code == 404
+    third = client.post("/connect/sqlite", json={"path": source_db}).json()
+    assert not third["reused"]
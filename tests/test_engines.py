@@ -0,0 +1,7 @@
+from backend.engines import get_engine
+
+
+def test_engines_are_shared_per_database(source_db):
+    first = get_engine(f"sqlite:///{source_db}")
+    assert get_engine(f"sqlite:///{source_db}") is first
+    assert get_engine(f"sqlite:///{source_db}.other") is not first
@@ -0,0 +1,85 @@
+import sqlite3
+import threading
+
+from sqlalchemy import create_engine
+
+from backend import database, reflection
+from backend.database import table_content_hash
+from backend.reflection import get_table_estimates, reflect_foreign_keys, reflect_schema_bulk, reflect_schema_parallel, reflect_tables
+
+
+def by_name(schema):
+    return {table["name"]: table["columns"] for table in schema}
+
+
+def test_bulk_reflection_matches_the_inspector(source_db):
+    engine = create_engine(f"sqlite:///{source_db}")
+    bulk = by_name(reflect_schema_bulk(engine))
+    serial = by_name(database.get_schema_from_inspector(engine, workers=1))
+    assert bulk.keys() == serial.keys() == {"customers", "orders", "items", "lone"}
+    for name in bulk:
+        assert table_content_hash(bulk[name]) == table_content_hash(serial[name]), name
+    assert [column["name"] for column in bulk["orders"]] == ["id", "customer_id", "total"]
+    assert bulk["customers"][0]["primary_key"] and not bulk["customers"][1]["nullable"]
+
+
+def test_declared_types_render_like_the_inspector(tmp_path):
+    path = str(tmp_path / "types.db")
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE measures (id INTEGER PRIMARY KEY, amount DOUBLE PRECISION, code CHARACTER VARYING(20), "
+                       "big UNSIGNED BIG INT, label varchar(10), price decimal(10, 2), note \"free form\", raw)")
+    connection.close()
+    engine = create_engine(f"sqlite:///{path}")
+    bulk = [column["type"] for column in by_name(reflect_schema_bulk(engine))["measures"]]
+    serial = [column["type"] for column in by_name(database.get_schema_from_inspector(engine, workers=1))["measures"]]
+    assert bulk == serial
+    assert bulk[1:4] == ["REAL", "TEXT(20)", "INTEGER"]
+
+
+def test_parallel_reflection_agrees_with_a_full_bulk_pass(source_db):
+    engine = create_engine(f"sqlite:///{source_db}")
+    full = by_name(reflect_schema_bulk(engine))
+    parallel = by_name(reflect_schema_parallel(engine, workers=4))
+    assert {name: table_content_hash(columns) for name, columns in parallel.items()} == \
+        {name: table_content_hash(columns) for name, columns in full.items()}
+
+
+def test_filtered_reflection_reads_only_the_named_tables(source_db):
+    engine = create_engine(f"sqlite:///{source_db}")
+    full = by_name(reflect_schema_bulk(engine))
+    assert by_name(reflect_tables(engine, ["orders", "missing"])) == {"orders": full["orders"]}
+
+
+def test_foreign_keys_come_from_the_catalog(source_db):
+    engine = create_engine(f"sqlite:///{source_db}")
+    edges = {(fk["table_name"], fk["column_name"], fk["referred_table"]) for fk in reflect_foreign_keys(engine)}
+    assert edges == {("orders", "customer_id", "customers"), ("items", "order_id", "orders")}
+
+
+def test_estimates_come_from_the_catalog(source_db):
+    estimates = get_table_estimates(create_engine(f"sqlite:///{source_db}"))
+    assert estimates["orders"]["row_estimate"] == 200
+    assert estimates["lone"]["row_estimate"] == 0
+
+
+def test_tables_that_time_out_keep_their_saved_definition(internal_store, source_db, monkeypatch):
+    engine = create_engine(f"sqlite:///{source_db}")
+    connection_id = database.save_connection_details("sqlite", {"path": source_db}, database.get_sqlite_schema(source_db))
+    reflect_table = reflection._reflect_table
+    release = threading.Event()
+
+    def slow_orders(engine, table_name):
+        if table_name == "orders":
+            release.wait(5)
+        return reflect_table(engine, table_name)
+
+    monkeypatch.setattr(reflection, "_reflect_table", slow_orders)
+    schema = reflect_schema_parallel(engine, workers=4, table_timeout=0.2)
+    release.set()
+    assert next(table for table in schema if table["name"] == "orders")["timed_out"]
+
+    result = database.save_schema_snapshot("sqlite", {"path": source_db}, schema)
+    assert result["connection_id"] == connection_id
+    assert (result["added"], result["changed"], result["removed"]) == ([], [], [])
+    orders = database.load_connection_metadata(connection_id, ["orders"])["tables"][0]
+    assert [column["name"] for column in orders["columns"]] == ["id", "customer_id", "total"]
@@ -0,0 +1,45 @@
+import sqlite3
+
+from backend import database
+
+
+def alter(path, script):
+    connection = sqlite3.connect(path)
+    connection.executescript(script)
+    connection.close()
+
+
+def test_refresh_without_changes_reports_nothing(internal_store, source_db):
+    connection_id = database.save_connection_details("sqlite", {"path": source_db}, database.get_sqlite_schema(source_db))
+    result = database.refresh_connection_schema(connection_id)
+    assert (result["added"], result["changed"], result["removed"]) == ([], [], [])
+
+
+def test_refresh_reports_only_changed_tables(internal_store, source_db):
+    alter(source_db, "CREATE TABLE measures (id INTEGER PRIMARY KEY, amount DOUBLE PRECISION, big UNSIGNED BIG INT);")
+    connection_id = database.save_connection_details("sqlite", {"path": source_db}, database.get_sqlite_schema(source_db))
+    alter(source_db, """
+        ALTER TABLE orders ADD COLUMN status TEXT;
+        CREATE TABLE shipments (id INTEGER PRIMARY KEY, order_id INTEGER, weight DOUBLE PRECISION);
+        DROP TABLE lone;
+    """)
+    result = database.refresh_connection_schema(connection_id)
+    assert result["added"] == ["shipments"]
+    assert result["changed"] == ["orders"]
+    assert result["removed"] == ["lone"]
+
+    # Re-reflected tables must hash like a full connect, or every refresh reports them again.
+    again = database.refresh_connection_schema(connection_id)
+    assert (again["added"], again["changed"], again["removed"]) == ([], [], [])
+    reconnect = database.save_schema_snapshot("sqlite", {"path": source_db}, database.get_sqlite_schema(source_db))
+    assert (reconnect["added"], reconnect["changed"], reconnect["removed"]) == ([], [], [])
+
+    columns = {table["name"]: table["columns"] for table in database.load_connection_metadata(connection_id)["tables"]}
+    shipments = {column["name"]: column for column in columns["shipments"]}
+    assert shipments["id"]["primary_key"]
+    assert shipments["weight"]["type"] == "REAL"
+    assert [column["name"] for column in columns["orders"]][-1] == "status"
+
+
+def test_refresh_of_missing_connection_returns_none(internal_store):
+    assert database.refresh_connection_schema(12345) is None
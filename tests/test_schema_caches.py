@@ -0,0 +1,166 @@
+import random
+import threading
+
+import pytest
+
+from backend import compact_schema, join_graph, schema_context, schema_index
+from backend.schema_context import compile_metadata, estimate_tokens, get_schema_context
+from backend.schema_index import SchemaIndex
+
+
+def make_metadata(tables=12, columns=20, seed=7):
+    rng = random.Random(seed)
+    return {
+        "connection_id": 1,
+        "db_type": "sqlite",
+        "global_context": "Retail warehouse",
+        "tables": [
+            {
+                "name": f"table_{t}",
+                "table_context": f"context for table {t}" if t % 2 else None,
+                "row_estimate": rng.choice([None, 10 ** rng.randint(1, 8)]),
+                "columns": [
+                    {"name": "id" if c == 0 else f"column_{c}", "type": "INTEGER", "nullable": c % 2 == 0,
+                     "primary_key": c == 0, "description": "d" * rng.randint(0, 40) or None}
+                    for c in range(rng.randint(1, columns))
+                ],
+                "foreign_keys": []
+            }
+            for t in range(tables)
+        ]
+    }
+
+
+@pytest.mark.parametrize("budget", [1, 5, 20, 60, 150, 400, 1000])
+def test_rendered_context_never_exceeds_the_budget(budget):
+    for seed in range(20):
+        compiled = compile_metadata(make_metadata(seed=seed))
+        rendered = schema_context._render(compiled, None, budget)
+        assert rendered["tokens"] <= budget
+        assert estimate_tokens(rendered["context"]) == rendered["tokens"]
+
+
+def uniform_metadata(tables, columns):
+    return {"tables": [
+        {"name": f"t{t}", "columns": [
+            {"name": "id" if c == 0 else f"filler_{c}", "type": "TEXT", "primary_key": c == 0}
+            for c in range(columns)
+        ]}
+        for t in range(tables)
+    ]}
+
+
+def test_columns_are_trimmed_across_tables_before_any_table_is_dropped():
+    compiled = compile_metadata(uniform_metadata(tables=4, columns=11))
+    rendered = schema_context._render(compiled, None, 150)
+    text = rendered["context"]
+    assert rendered["truncated"] and rendered["tokens"] <= 150
+    assert [line for line in text.splitlines() if line.startswith("Table ")] == ["Table t0", "Table t1", "Table t2", "Table t3"]
+    assert text.count("  - id TEXT PK") == 4
+    assert text.count("more columns") == 4 and "more tables" not in text
+    # The latest filler columns go first in every table, so none keeps all of them.
+    assert "filler_10" not in text and "filler_1 " in text
+
+
+def test_low_ranked_tables_are_dropped_when_their_keys_do_not_fit():
+    compiled = compile_metadata(uniform_metadata(tables=4, columns=11))
+    rendered = schema_context._render(compiled, ["t2", "t0", "t3", "t1"], 40)
+    text = rendered["context"]
+    assert rendered["tokens"] <= 40
+    assert [line for line in text.splitlines() if line.startswith("Table ")] == ["Table t2", "Table t0"]
+    assert text.count("  - id TEXT PK") == 2
+    assert text.endswith("... 2 more tables")
+
+
+def test_an_oversized_first_table_is_cut_to_the_budget():
+    metadata = make_metadata(tables=1, columns=200, seed=1)
+    rendered = get_schema_context(99, lambda connection_id: metadata, token_budget=50)
+    assert rendered["tokens"] <= 50
+    assert "more columns" in rendered["context"]
+    schema_context.invalidate(99)
+
+
+def slow_loader(metadata, started, release):
+    def load(connection_id, table_names=None):
+        started.set()
+        release.wait(5)
+        return metadata
+    return load
+
+
+@pytest.mark.parametrize("get, edit, cache", [
+    (lambda load: schema_context._get_compiled(1, load),
+     lambda: schema_context.on_table_context_updated(1, "table_0", "edited"),
+     lambda: schema_context._compiled),
+    (lambda load: schema_index.get_index(1, load, lambda connection_id: "fingerprint"),
+     lambda: schema_index.invalidate(1),
+     lambda: schema_index._indexes),
+    (lambda load: compact_schema.get_schema(1, load),
+     lambda: compact_schema.on_table_context_updated(1, "table_0", "edited"),
+     lambda: compact_schema._schemas),
+    (lambda load: join_graph.get_graph(1, lambda connection_id: {
+        "tables": [table["name"] for table in load(connection_id)["tables"]], "foreign_keys": []}),
+     lambda: join_graph.invalidate(1),
+     lambda: join_graph._graphs),
+])
+def test_loads_that_race_an_edit_are_not_cached(get, edit, cache, internal_store):
+    started, release = threading.Event(), threading.Event()
+    loader = threading.Thread(target=get, args=(slow_loader(make_metadata(), started, release),))
+    loader.start()
+    assert started.wait(5)
+    edit()
+    release.set()
+    loader.join()
+    assert 1 not in cache()
+    get(lambda connection_id, table_names=None: make_metadata())
+    assert 1 in cache()
+
+
+def test_index_search_ranks_by_name_and_descriptions():
+    index = SchemaIndex.from_metadata({"tables": [
+        {"name": "customers", "columns": [{"name": "id"}, {"name": "email", "description": "contact address"}]},
+        {"name": "orders", "columns": [{"name": "id"}, {"name": "customer_id"}, {"name": "total"}]},
+        {"name": "shipments", "columns": [{"name": "carrier"}]},
+    ]})
+    assert index.search("orders per customer")[0]["name"] == "orders"
+    assert index.search("contact address")[0]["name"] == "customers"
+    assert index.search("shipmnts")[0]["name"] == "shipments" # fuzzy trigram match
+
+
+def test_index_files_are_reused_only_for_the_schema_they_were_built_from(internal_store):
+    loads = []
+
+    def load(connection_id, table_names=None):
+        loads.append(connection_id)
+        return make_metadata(tables=3)
+
+    schema_index.get_index(1, load, lambda connection_id: "schema-a")
+    schema_index._indexes.clear() # as after a restart; the file stays on disk
+    assert schema_index.get_index(1, load, lambda connection_id: "schema-a").fingerprint == "schema-a"
+    assert loads == [1]
+
+    schema_index._indexes.clear()
+    assert schema_index.get_index(1, load, lambda connection_id: "schema-b").fingerprint == "schema-b"
+    assert loads == [1, 1]
+
+
+def test_index_of_empty_documents_searches_without_error():
+    index = SchemaIndex({"a": {}, "b": {}})
+    assert index.search("anything") == []
+    index.update_table("c", {"orders": 1})
+    assert index.search("orders")[0]["name"] == "c"
+
+
+def test_single_table_fetch_on_a_cold_cache_loads_only_that_table():
+    calls = []
+
+    def load(connection_id, table_names=None):
+        calls.append(table_names)
+        metadata = make_metadata(tables=3)
+        metadata["tables"] = [table for table in metadata["tables"] if table_names is None or table["name"] in table_names]
+        return metadata
+
+    assert compact_schema.get_table(1, "table_1", load)["name"] == "table_1"
+    assert compact_schema.get_table(1, "missing", load) is None
+    assert calls == [["table_1"], ["missing"]]
+    assert 1 not in compact_schema._schemas
@@ -0,0 +1,112 @@
+import shutil
+import threading
+
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
+
+from backend import database
+from backend.models import SavedColumnDescription, SavedConnection, SavedSchema, SavedTableDefinition
+
+
+def count(engine, model, *criteria):
+    session = sessionmaker(bind=engine)()
+    try:
+        return session.query(func.count(model.id)).filter(*criteria).scalar()
+    finally:
+        session.close()
+
+
+def test_identical_tables_share_one_definition(internal_store, source_db, tmp_path):
+    copy = str(tmp_path / "copy.db")
+    shutil.copy(source_db, copy)
+    first = database.save_connection_details("sqlite", {"path": source_db}, database.get_sqlite_schema(source_db))
+    second = database.save_connection_details("sqlite", {"path": copy}, database.get_sqlite_schema(copy))
+    assert first != second
+    assert count(internal_store, SavedSchema) == 8
+    assert count(internal_store, SavedTableDefinition) == 4
+
+
+def test_reconnecting_reuses_the_saved_connection(internal_store, source_db):
+    schema = database.get_sqlite_schema(source_db)
+    created = database.save_schema_snapshot("sqlite", {"path": source_db}, schema)
+    reused = database.save_schema_snapshot("sqlite", {"path": source_db}, schema)
+    assert not created["reused"]
+    assert reused["reused"] and reused["connection_id"] == created["connection_id"]
+    assert (reused["added"], reused["changed"], reused["removed"]) == ([], [], [])
+    assert count(internal_store, SavedConnection) == 1
+
+
+def test_concurrent_first_connects_create_one_snapshot(internal_store, source_db):
+    schema = database.get_sqlite_schema(source_db)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(database.save_schema_snapshot("sqlite", {"path": source_db}, schema)))
+        for _ in range(6)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({result["connection_id"] for result in results}) == 1
+    assert count(internal_store, SavedConnection) == 1
+    assert count(internal_store, SavedSchema) == 4
+
+
+def test_column_descriptions_upsert_per_column(internal_store, source_db):
+    connection_id = database.save_connection_details("sqlite", {"path": source_db}, database.get_sqlite_schema(source_db))
+    assert database.update_column_description(connection_id, "orders", "total", "first")
+    assert database.update_column_description(connection_id, "orders", "total", "second")
+    assert not database.update_column_description(connection_id, "orders", "missing", "nope")
+    assert count(internal_store, SavedColumnDescription) == 1
+    metadata = database.load_connection_metadata(connection_id, ["orders"])
+    total = next(column for column in metadata["tables"][0]["columns"] if column["name"] == "total")
+    assert total["description"] == "second"
+
+
+def test_delete_stopped_part_way_is_hidden_and_resumable(internal_store, source_db, monkeypatch):
+    connection_id = database.save_connection_details("sqlite", {"path": source_db}, database.get_sqlite_schema(source_db))
+    delete_in_batches = database.delete_in_batches
+
+    def failing(session, model, criteria, batch_size=None):
+        if model is SavedSchema:
+            raise RuntimeError("store went away")
+        return delete_in_batches(session, model, criteria, batch_size)
+
+    monkeypatch.setattr(database, "delete_in_batches", failing)
+    try:
+        database.delete_saved_connection(connection_id)
+    except RuntimeError:
+        pass
+    monkeypatch.setattr(database, "delete_in_batches", delete_in_batches)
+
+    assert database.pending_connection_deletes() == [connection_id]
+    assert database.list_saved_connections() == []
+    assert database.list_saved_tables(connection_id) is None
+    assert database.resume_connection(connection_id) is None
+
+    deleted = database.delete_saved_connection(connection_id)
+    assert deleted["saved_schemas"] == 4
+    assert database.pending_connection_deletes() == []
+    assert count(internal_store, SavedSchema) == 0
+
+
+def test_catalog_estimates_are_saved_with_the_snapshot(internal_store, source_db):
+    connection_id = database.save_connection_details("sqlite", {"path": source_db}, database.get_sqlite_schema(source_db))
+    tables = {table["name"]: table for table in database.list_saved_tables(connection_id)["tables"]}
+    assert tables["orders"]["row_estimate"] == 200
+    assert tables["customers"]["row_estimate"] == 50
+    assert tables["orders"]["size_bytes"] > 0
+
+
+def test_metadata_for_named_tables_reads_only_their_foreign_keys(internal_store, source_db, monkeypatch):
+    connection_id = database.save_connection_details("sqlite", {"path": source_db}, database.get_sqlite_schema(source_db))
+    load_foreign_key_rows, requested = database.load_foreign_key_rows, []
+
+    def spy(session, connection_id, table_names=None):
+        requested.append(table_names)
+        return load_foreign_key_rows(session, connection_id, table_names)
+
+    monkeypatch.setattr(database, "load_foreign_key_rows", spy)
+    metadata = database.load_connection_metadata(connection_id, ["orders"])
+    assert requested == [["orders"]]
+    assert [fk["referred_table"] for fk in metadata["tables"][0]["foreign_keys"]] == ["customers"]
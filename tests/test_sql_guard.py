@@ -0,0 +1,58 @@
+import pytest
+
+from backend import sql_guard
+from backend.sql_guard import check_sql, guard_cache_info
+
+
+@pytest.mark.parametrize("dialect, sql", [
+    ("postgresql", "SELECT * FROM orders WHERE total > 10"),
+    ("postgresql", "WITH recent AS (SELECT * FROM orders) SELECT count(*) FROM recent"),
+    ("postgresql", "SELECT updated_at, deleted FROM customers"),
+    ("postgresql", "SELECT 'DROP TABLE orders; --' AS note"),
+    ("postgresql", 'SELECT "name" FROM customers'),
+    ("mssql", "SELECT [order] FROM [items]"),
+    ("sqlite", "SELECT id FROM orders -- DELETE FROM orders"),
+])
+def test_read_only_queries_are_allowed(dialect, sql):
+    assert check_sql(sql, dialect).allowed
+
+
+@pytest.mark.parametrize("dialect, sql", [
+    ("postgresql", "DELETE FROM orders"),
+    ("postgresql", "SELECT 1; DROP TABLE orders"),
+    ("postgresql", "SELECT * INTO backup FROM orders"),
+    ("postgresql", "SELECT * FROM orders FOR UPDATE"),
+    ("postgresql", "SELECT pg_sleep(10)"),
+    ("mysql", "SELECT /*! DELETE FROM orders */ 1"),
+    ("sqlite", "SELECT 1 /* unterminated"),
+])
+def test_writes_and_side_effects_are_rejected(dialect, sql):
+    assert not check_sql(sql, dialect).allowed
+
+
+@pytest.mark.parametrize("dialect, sql", [
+    ("postgresql", 'SELECT "pg_sleep"(10)'),
+    ("postgresql", 'SELECT "dblink_exec"(\'dbname=x\', \'DROP TABLE t\')'),
+    ("postgresql", 'SELECT "pg_catalog"."lo_import"(\'/etc/passwd\')'),
+    ("mysql", "SELECT `sleep`(5)"),
+    ("mysql", 'SELECT "sleep"(5)'),
+    ("mssql", "SELECT [xp_cmdshell]('dir')"),
+    ("postgresql", 'SELECT 1 "DELETE"'),
+])
+def test_quoted_identifiers_cannot_bypass_the_guard(dialect, sql):
+    assert not check_sql(sql, dialect).allowed
+
+
+def test_verdicts_are_cached_on_the_normalized_token_stream():
+    check_sql("SELECT id FROM lone_guard_probe", "sqlite")
+    hits = guard_cache_info().hits
+    verdict = check_sql("SELECT   id\n  FROM lone_guard_probe -- same query", "sqlite")
+    assert verdict.allowed
+    assert verdict.normalized == "SELECT id FROM lone_guard_probe"
+    assert guard_cache_info().hits == hits + 1
+
+
+def test_repeated_query_text_is_not_tokenized_again(monkeypatch):
+    check_sql("SELECT id FROM text_guard_probe", "sqlite")
+    monkeypatch.setattr(sql_guard, "tokenize", lambda sql, dialect: pytest.fail("tokenized a cached query"))
+    assert check_sql("  SELECT id FROM text_guard_probe\n", "sqlite").allowed